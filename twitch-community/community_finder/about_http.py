@@ -0,0 +1,154 @@
+import asyncio
+import threading
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# The About page itself is rendered from these GQL fields; the public web
+# client id is what twitch.tv sends for anonymous visitors.
+GQL_ENDPOINT = "https://gql.twitch.tv/gql"
+GQL_WEB_CLIENT_ID = "kimne78kx3ncx6brgo4mv6wki5h1ko"
+
+_USER_FIELDS = """
+    id
+    login
+    description
+    panels {
+        ... on DefaultPanel {
+            title
+            description
+            linkURL
+        }
+    }
+    channel {
+        socialMedias {
+            title
+            url
+        }
+    }
+"""
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            s.mount("https://", adapter)
+            s.headers.update({"Client-Id": GQL_WEB_CLIENT_ID})
+            _session = s
+        return _session
+
+
+def _build_query(logins: list[str]) -> dict[str, Any]:
+    var_decls = ", ".join(f"$l{i}: String!" for i in range(len(logins)))
+    parts = [f"u{i}: user(login: $l{i}) {{{_USER_FIELDS}}}" for i in range(len(logins))]
+    query = f"query AboutPanels({var_decls}) {{\n" + "\n".join(parts) + "\n}"
+    variables = {f"l{i}": login for i, login in enumerate(logins)}
+    return {"query": query, "variables": variables}
+
+
+def _texts_from_user(user: dict[str, Any]) -> list[str]:
+    texts: list[str] = []
+    if isinstance(user.get("description"), str):
+        texts.append(user["description"])
+
+    for p in user.get("panels") or []:
+        if not isinstance(p, dict):
+            continue
+        for k in ("title", "description", "linkURL"):
+            v = p.get(k)
+            if isinstance(v, str) and v:
+                texts.append(v)
+
+    channel = user.get("channel") or {}
+    for sm in channel.get("socialMedias") or []:
+        if not isinstance(sm, dict):
+            continue
+        for k in ("title", "url"):
+            v = sm.get(k)
+            if isinstance(v, str) and v:
+                texts.append(v)
+
+    return texts
+
+
+def fetch_about_texts(
+    logins: list[str], timeout: float = 15, missing: set[str] | None = None
+) -> dict[str, list[str] | None]:
+    """
+    One GQL request for a whole batch of logins.
+    Returns login -> list of text blobs (description, panels, social links).
+    A login maps to None when the response tells us nothing reliable
+    (request failed, field errors, unknown user); callers should fall back.
+    Logins the (error-free) response says don't exist are added to `missing`.
+    """
+    out: dict[str, list[str] | None] = {login: None for login in logins}
+    if not logins:
+        return out
+
+    try:
+        resp = _get_session().post(GQL_ENDPOINT, json=_build_query(logins), timeout=timeout)
+    except requests.RequestException:
+        return out
+    return _parse_response(logins, resp, out, missing)
+
+
+def _parse_response(
+    logins: list[str], resp: Any, out: dict[str, list[str] | None], missing: set[str] | None
+) -> dict[str, list[str] | None]:
+    if resp.status_code != 200:
+        return out
+
+    try:
+        body = resp.json()
+    except ValueError:
+        return out
+
+    # GQL answers 200 with partial data; any error means we can't trust an empty result.
+    if not isinstance(body, dict) or body.get("errors"):
+        return out
+    data = body.get("data")
+    if not isinstance(data, dict):
+        return out
+
+    for i, login in enumerate(logins):
+        user = data.get(f"u{i}")
+        if isinstance(user, dict):
+            out[login] = _texts_from_user(user)
+        elif f"u{i}" in data and user is None and missing is not None:
+            missing.add(login)
+
+    return out
+
+
+def fetch_about_texts_batched(
+    logins: list[str], batch_size: int, timeout: float = 15, missing: set[str] | None = None
+) -> dict[str, list[str] | None]:
+    out: dict[str, list[str] | None] = {}
+    step = max(1, int(batch_size))
+    for i in range(0, len(logins), step):
+        out.update(fetch_about_texts(logins[i : i + step], timeout=timeout, missing=missing))
+    return out
+
+
+async def fetch_about_texts_batched_async(
+    logins: list[str], batch_size: int, timeout: float = 15, missing: set[str] | None = None
+) -> dict[str, list[str] | None]:
+    """All batches at once, each on a worker thread; the session's pool bounds the connections."""
+    step = max(1, int(batch_size))
+    parts = await asyncio.gather(
+        *(
+            asyncio.to_thread(fetch_about_texts, logins[i : i + step], timeout=timeout, missing=missing)
+            for i in range(0, len(logins), step)
+        )
+    )
+    out: dict[str, list[str] | None] = {}
+    for part in parts:
+        out.update(part)
+    return out
@@ -0,0 +1,253 @@
+import time
+from typing import Any
+
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from .invites import DISCORD_URL_REGEX, DISCORD_BARE_REGEX, extract_discord_from_html
+from .state import OUTCOME_FOUND, OUTCOME_RENDERED_EMPTY, OUTCOME_TIMED_OUT, OUTCOME_ERROR
+
+# Rendering a channel's About page in Chrome. Imported only once a scrape
+# actually needs a browser, so the menu starts without loading Selenium.
+
+# In-page invite matcher shared by the scripts below: harvest(node) returns only
+# the invite-shaped hrefs and text snippets under node, filtered in the browser.
+_DISCORD_MATCH_JS = r"""
+var SRC = "(?:https?:\\/\\/)?(?:www\\.)?(?:discord\\.gg\\/[A-Za-z0-9-]+|(?:discord|discordapp)\\.com\\/invite\\/[A-Za-z0-9-]+)";
+var INVITE_ALL = new RegExp(SRC, "gi");
+var INVITE_ONE = new RegExp(SRC, "i");
+
+function harvest(node) {
+    var out = {hrefs: [], texts: []};
+    if (!node) return out;
+    var anchors = [];
+    if (node.nodeType === 1) {
+        if (node.tagName === "A") anchors.push(node);
+        var inner = node.querySelectorAll("a[href]");
+        for (var i = 0; i < inner.length; i++) anchors.push(inner[i]);
+    }
+    for (var j = 0; j < anchors.length; j++) {
+        var h = anchors[j].href;
+        if (h && INVITE_ONE.test(h) && out.hrefs.indexOf(h) < 0) out.hrefs.push(h);
+    }
+    var text = node.nodeType === 3 ? node.data : (node.textContent || "");
+    var m = text.match(INVITE_ALL) || [];
+    for (var k = 0; k < m.length; k++) {
+        if (out.texts.indexOf(m[k]) < 0) out.texts.push(m[k]);
+    }
+    return out;
+}
+
+function hit(res) { return res.hrefs.length > 0 || res.texts.length > 0; }
+function page() { return document.body || document.documentElement; }
+"""
+
+# One round-trip replacement for find_elements("a") + get_attribute("href") per anchor.
+_HARVEST_DISCORD_JS = _DISCORD_MATCH_JS + r"""
+return harvest(page());
+"""
+
+# Runs inside the page. Resolves with only the invite-shaped hrefs/text it saw,
+# as soon as one appears (MutationObserver); with nothing once the About panels
+# have rendered and settled; or with nothing after waitMs.
+_WATCH_DISCORD_JS = _DISCORD_MATCH_JS + r"""
+var waitMs = arguments[0];
+var renderedSelectors = arguments[1] || [];
+var settleMs = arguments[2] || 0;
+var done = arguments[arguments.length - 1];
+
+function rendered() {
+    for (var i = 0; i < renderedSelectors.length; i++) {
+        try {
+            if (document.querySelector(renderedSelectors[i])) return true;
+        } catch (e) {}
+    }
+    return false;
+}
+
+var finished = false;
+var observer = null;
+var timer = null;
+var settleTimer = null;
+function finish(res, outcome) {
+    if (finished) return;
+    finished = true;
+    if (observer) observer.disconnect();
+    if (timer) clearTimeout(timer);
+    if (settleTimer) clearTimeout(settleTimer);
+    res.outcome = outcome;
+    done(res);
+}
+
+// Panels arrive together, so once the About section exists we give it
+// settleMs to fill in, take one last look, and stop.
+function armSettle() {
+    if (settleTimer || finished || !rendered()) return;
+    settleTimer = setTimeout(function () {
+        var res = harvest(page());
+        finish(res, hit(res) ? "found" : "rendered-empty");
+    }, settleMs);
+}
+
+var first = harvest(page());
+if (hit(first)) { finish(first, "found"); return; }
+
+observer = new MutationObserver(function (mutations) {
+    for (var i = 0; i < mutations.length; i++) {
+        var mu = mutations[i];
+        var nodes = mu.type === "childList" ? mu.addedNodes : [mu.target];
+        for (var j = 0; j < nodes.length; j++) {
+            if (hit(harvest(nodes[j]))) { finish(harvest(page()), "found"); return; }
+        }
+    }
+    armSettle();
+});
+observer.observe(document.documentElement, {
+    childList: true, subtree: true, characterData: true,
+    attributes: true, attributeFilter: ["href"]
+});
+timer = setTimeout(function () { finish({hrefs: [], texts: []}, "timed-out"); }, waitMs);
+armSettle();
+"""
+
+_RENDERED_JS = r"""
+var sels = arguments[0] || [];
+for (var i = 0; i < sels.length; i++) {
+    try {
+        if (document.querySelector(sels[i])) return true;
+    } catch (e) {}
+}
+return false;
+"""
+
+
+def _v(cfg: dict[str, Any], msg: str) -> None:
+    if cfg.get("VERBOSE", False):
+        print(f"[VERBOSE] {msg}")
+
+
+def extract_discord_about(driver: webdriver.Chrome, cfg: dict[str, Any], streamer_login: str) -> tuple[list[str], str]:
+    """
+    Returns (links, outcome) where outcome says why the scrape ended:
+    found | rendered-empty | timed-out | error.
+    """
+    url = f"https://www.twitch.tv/{streamer_login}/about"
+    _v(cfg, f"Loading About page: {url}")
+
+    try:
+        driver.get(url)
+    except TimeoutException:
+        _v(cfg, f"Page load timeout for {streamer_login} (continuing)")
+    except WebDriverException as e:
+        _v(cfg, f"WebDriver error during get() for {streamer_login}: {e}")
+        return [], OUTCOME_ERROR
+
+    try:
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+    except WebDriverException:
+        pass
+
+    if cfg.get("DISCORD_DETECT_MODE") == "observer":
+        out, outcome = _wait_for_discord_observer(driver, cfg, streamer_login)
+    else:
+        out, outcome = _wait_for_discord_poll(driver, cfg, streamer_login)
+
+    _v(cfg, f"Found {len(out)} Discord link(s) for {streamer_login} ({outcome})")
+    return out, outcome
+
+
+def extract_discord_links_from_about(driver: webdriver.Chrome, cfg: dict[str, Any], streamer_login: str) -> list[str]:
+    links, _ = extract_discord_about(driver, cfg, streamer_login)
+    return links
+
+
+def _links_from_watch_result(res: Any) -> list[str]:
+    found: set[str] = set()
+    if not isinstance(res, dict):
+        return []
+    for href in res.get("hrefs") or []:
+        if isinstance(href, str) and (DISCORD_URL_REGEX.search(href) or DISCORD_BARE_REGEX.search(href)):
+            found.add(href)
+    texts = [t for t in (res.get("texts") or []) if isinstance(t, str)]
+    for x in extract_discord_from_html("\n".join(texts)):
+        found.add(x)
+    return sorted(found)
+
+
+def _wait_for_discord_observer(
+    driver: webdriver.Chrome, cfg: dict[str, Any], streamer_login: str
+) -> tuple[list[str], str]:
+    wait_s = int(cfg["DISCORD_WAIT_SECONDS"])
+    settle_ms = int(float(cfg["DISCORD_RENDER_SETTLE_SECONDS"]) * 1000)
+    try:
+        # The script resolves itself at wait_s; the driver timeout is only a backstop.
+        driver.set_script_timeout(wait_s + 5)
+        res = driver.execute_async_script(
+            _WATCH_DISCORD_JS, wait_s * 1000, list(cfg["DISCORD_RENDERED_SELECTORS"]), settle_ms
+        )
+    except WebDriverException as e:
+        _v(cfg, f"Discord watcher failed for {streamer_login}: {e}")
+        return [], OUTCOME_ERROR
+
+    links = _links_from_watch_result(res)
+    outcome = res.get("outcome") if isinstance(res, dict) else None
+    if links:
+        outcome = OUTCOME_FOUND
+    elif outcome not in (OUTCOME_RENDERED_EMPTY, OUTCOME_TIMED_OUT):
+        outcome = OUTCOME_TIMED_OUT
+    return links, outcome
+
+
+def _wait_for_discord_poll(
+    driver: webdriver.Chrome, cfg: dict[str, Any], streamer_login: str
+) -> tuple[list[str], str]:
+    deadline = time.time() + int(cfg["DISCORD_WAIT_SECONDS"])
+    poll = float(cfg["DISCORD_POLL_INTERVAL_SECONDS"])
+    settle = float(cfg["DISCORD_RENDER_SETTLE_SECONDS"])
+    selectors = list(cfg["DISCORD_RENDERED_SELECTORS"])
+
+    outcome = OUTCOME_TIMED_OUT
+    rendered_at: float | None = None
+
+    html = ""
+    while time.time() < deadline:
+        try:
+            html = driver.page_source or ""
+        except WebDriverException:
+            html = ""
+        lower = html.lower()
+        if ("discord.gg" in lower) or ("discord.com/invite" in lower) or ("discordapp.com/invite" in lower):
+            _v(cfg, f"Discord text detected in HTML for {streamer_login}")
+            outcome = OUTCOME_FOUND
+            break
+
+        if rendered_at is None and selectors:
+            try:
+                if driver.execute_script(_RENDERED_JS, selectors):
+                    rendered_at = time.time()
+            except WebDriverException:
+                pass
+        if rendered_at is not None and (time.time() - rendered_at) >= settle:
+            outcome = OUTCOME_RENDERED_EMPTY
+            break
+
+        time.sleep(poll)
+
+    found: set[str] = set()
+
+    # Pull from anchors/text in a single script call
+    try:
+        for x in _links_from_watch_result(driver.execute_script(_HARVEST_DISCORD_JS)):
+            found.add(x)
+    except WebDriverException:
+        pass
+
+    # Pull from HTML regex
+    for x in extract_discord_from_html(html):
+        found.add(x)
+
+    if found:
+        outcome = OUTCOME_FOUND
+    elif outcome == OUTCOME_FOUND:
+        outcome = OUTCOME_RENDERED_EMPTY
+    return sorted(found), outcome
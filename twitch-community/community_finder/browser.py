@@ -0,0 +1,602 @@
+import atexit
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Iterator
+
+from .settings import load_settings
+from .state import RESOURCE_TYPE_PATTERNS
+from .paths import BROWSER_PROFILES_DIR
+from .locks import try_lock_file, release_lock_file
+
+try:
+    import psutil  # optional: real process-tree memory numbers
+except ImportError:
+    psutil = None
+
+# Selenium is imported by the functions that actually drive Chrome, so the
+# pool/stats helpers can be imported at startup without loading it.
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+
+# Blocked requests never report a size; these typical sizes give a rough bytes-saved figure.
+_EST_BYTES_BY_TYPE = {
+    "Media": 400_000,
+    "Script": 120_000,
+    "Font": 40_000,
+    "Image": 25_000,
+    "Stylesheet": 20_000,
+    "WebSocket": 20_000,
+    "XHR": 4_000,
+    "Fetch": 4_000,
+}
+_EST_BYTES_DEFAULT = 8_000
+
+network_stats = {"requests": 0, "blocked": 0, "bytes_downloaded": 0, "bytes_saved_est": 0}
+_net_lock = threading.Lock()
+
+
+def _secrets() -> dict[str, str]:
+    return load_settings()
+
+
+def blocked_url_patterns(cfg: dict[str, Any]) -> list[str]:
+    urls = list(cfg["BLOCKED_URL_PATTERNS"])
+    for t in cfg["BLOCKED_RESOURCE_TYPES"]:
+        urls.extend(RESOURCE_TYPE_PATTERNS.get(t, []))
+    return list(dict.fromkeys(urls))
+
+
+def apply_blocking_profile(driver: "webdriver.Chrome", cfg: dict[str, Any]) -> None:
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns(cfg)})
+
+
+def collect_network_stats(driver: "webdriver.Chrome") -> None:
+    """
+    Drains the driver's performance log and adds what it saw to network_stats.
+    Requests blocked by setBlockedURLs fail with blockedReason "inspector".
+    """
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return
+
+    types: dict[str, str] = {}
+    requests_seen = 0
+    blocked = 0
+    downloaded = 0
+    saved = 0
+
+    for e in entries:
+        try:
+            msg = json.loads(e["message"])["message"]
+        except (KeyError, TypeError, ValueError):
+            continue
+        method = msg.get("method")
+        params = msg.get("params") or {}
+
+        if method == "Network.requestWillBeSent":
+            requests_seen += 1
+            types[params.get("requestId", "")] = str(params.get("type") or "")
+        elif method == "Network.loadingFinished":
+            downloaded += int(params.get("encodedDataLength") or 0)
+        elif method == "Network.loadingFailed" and params.get("blockedReason") == "inspector":
+            blocked += 1
+            rtype = str(params.get("type") or types.get(params.get("requestId", ""), ""))
+            saved += _EST_BYTES_BY_TYPE.get(rtype, _EST_BYTES_DEFAULT)
+
+    with _net_lock:
+        network_stats["requests"] += requests_seen
+        network_stats["blocked"] += blocked
+        network_stats["bytes_downloaded"] += downloaded
+        network_stats["bytes_saved_est"] += saved
+
+
+def reset_network_stats() -> None:
+    with _net_lock:
+        for k in network_stats:
+            network_stats[k] = 0
+
+
+def network_stats_line() -> str:
+    with _net_lock:
+        st = dict(network_stats)
+    mb = 1024 * 1024
+    return (
+        f"Network: requests={st['requests']} blocked={st['blocked']} "
+        f"downloaded={st['bytes_downloaded'] / mb:.1f}MB saved~{st['bytes_saved_est'] / mb:.1f}MB"
+    )
+
+
+def make_driver(cfg: dict[str, Any], profile_dir: str | None = None) -> "webdriver.Chrome":
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    s = _secrets()
+
+    options = Options()
+    options.binary_location = s["CHROME_BINARY_PATH"]
+    options.page_load_strategy = str(cfg["PAGE_LOAD_STRATEGY"])
+
+    # Default to headless to avoid opening visible windows
+    options.add_argument("--headless=new")
+
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--window-size=1400,900")
+    options.add_argument("--disable-notifications")
+    options.add_argument("--mute-audio")
+
+    if profile_dir:
+        # Reused profile: JS bundles come from the disk/code cache instead of the network.
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        max_mb = int(cfg.get("BROWSER_PROFILE_MAX_MB", 0))
+        if max_mb > 0:
+            options.add_argument(f"--disk-cache-size={max_mb * 1024 * 1024}")
+
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    }
+    options.add_experimental_option("prefs", prefs)
+
+    blocking = bool(cfg.get("NETWORK_BLOCKING", False))
+    if blocking:
+        # Network events feed collect_network_stats()
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+    service = Service(s["CHROMEDRIVER_PATH"])
+
+    # If this fails, we want to see it in verbose mode, not silently swallow it.
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(int(cfg["PAGE_LOAD_TIMEOUT_SECONDS"]))
+
+    if blocking:
+        try:
+            apply_blocking_profile(driver, cfg)
+        except Exception as e:
+            if cfg.get("VERBOSE", False):
+                print(f"[VERBOSE] Could not apply network blocking profile: {e}")
+
+    return driver
+
+
+# Profile subfolders that only hold caches; safe to wipe when a profile grows too big.
+_PROFILE_CACHE_SUBDIRS = [
+    os.path.join("Default", "Cache"),
+    os.path.join("Default", "Code Cache"),
+    os.path.join("Default", "GPUCache"),
+    os.path.join("Default", "Service Worker", "CacheStorage"),
+    os.path.join("Default", "Service Worker", "ScriptCache"),
+    "ShaderCache",
+    "GrShaderCache",
+]
+
+_MAX_PROFILE_DIRS = 64
+
+
+def _dir_size_bytes(path: str) -> int:
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+class ProfileDirs:
+    """
+    Hands out reusable Chrome user-data dirs (slot-0, slot-1, ...) under root.
+    Each dir is used by exactly one live Chrome: held in-process and locked
+    on disk, so parallel finder instances pick different dirs.
+    """
+
+    def __init__(self, root: str, max_mb: int) -> None:
+        self.root = root
+        self.max_mb = int(max_mb)
+        self._lock = threading.Lock()
+        self._held: dict[str, Any] = {}
+
+    def acquire(self) -> str:
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock:
+            for i in range(_MAX_PROFILE_DIRS):
+                path = os.path.join(self.root, f"slot-{i}")
+                if path in self._held:
+                    continue
+                fh = try_lock_file(path + ".lock")
+                if fh is None:
+                    continue
+                self._held[path] = fh
+                break
+            else:
+                raise RuntimeError(f"No free browser profile dir under {self.root}")
+
+        # Only cleaned while no Chrome is using it.
+        self.prune(path)
+        return path
+
+    def release(self, path: str) -> None:
+        with self._lock:
+            fh = self._held.pop(path, None)
+        if fh is not None:
+            release_lock_file(fh)
+
+    def prune(self, path: str) -> None:
+        if self.max_mb <= 0 or not os.path.isdir(path):
+            return
+        if _dir_size_bytes(path) <= self.max_mb * 1024 * 1024:
+            return
+        for sub in _PROFILE_CACHE_SUBDIRS:
+            shutil.rmtree(os.path.join(path, sub), ignore_errors=True)
+
+
+_profile_dirs: dict[str, ProfileDirs] = {}
+_profile_dirs_lock = threading.Lock()
+
+
+def get_profile_dirs(cfg: dict[str, Any]) -> ProfileDirs | None:
+    if not cfg.get("BROWSER_PROFILE_CACHE", False):
+        return None
+    root = str(cfg.get("BROWSER_PROFILE_DIR") or "") or BROWSER_PROFILES_DIR
+    with _profile_dirs_lock:
+        pdirs = _profile_dirs.get(root)
+        if pdirs is None:
+            pdirs = ProfileDirs(root, int(cfg["BROWSER_PROFILE_MAX_MB"]))
+            _profile_dirs[root] = pdirs
+        pdirs.max_mb = int(cfg["BROWSER_PROFILE_MAX_MB"])
+        return pdirs
+
+
+def _quit_driver(driver: "webdriver.Chrome") -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def kill_driver_processes(driver: "webdriver.Chrome") -> bool:
+    """
+    Hard-kills chromedriver and the Chrome processes under it.
+    Returns True only if the whole tree is known to be gone.
+    """
+    proc = getattr(getattr(driver, "service", None), "process", None)
+    if proc is None:
+        return False
+
+    if psutil is not None:
+        try:
+            root = psutil.Process(proc.pid)
+            procs = root.children(recursive=True) + [root]
+            for p in procs:
+                try:
+                    p.kill()
+                except psutil.Error:
+                    pass
+            psutil.wait_procs(procs, timeout=3)
+            return True
+        except psutil.Error:
+            pass
+
+    if os.name == "nt":
+        try:
+            r = subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                capture_output=True,
+                timeout=10,
+            )
+            if r.returncode == 0:
+                return True
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+    try:
+        proc.kill()
+    except Exception:
+        pass
+    return False
+
+
+def driver_memory_mb(driver: "webdriver.Chrome") -> float:
+    from selenium.common.exceptions import WebDriverException
+
+    # Prefer the RSS of chromedriver + Chrome children; fall back to the page's JS heap.
+    if psutil is not None:
+        try:
+            root = psutil.Process(driver.service.process.pid)
+            procs = [root] + root.children(recursive=True)
+            total = 0
+            for p in procs:
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    pass
+            return total / (1024 * 1024)
+        except Exception:
+            pass
+    try:
+        used = driver.execute_script(
+            "return (window.performance && performance.memory && performance.memory.usedJSHeapSize) || 0;"
+        )
+        return float(used or 0) / (1024 * 1024)
+    except WebDriverException:
+        return 0.0
+
+
+class PooledDriver:
+    def __init__(self, driver: "webdriver.Chrome", slot: int, profile_dir: str | None = None) -> None:
+        self.driver = driver
+        self.slot = slot
+        self.profile_dir = profile_dir
+        self.dead = False
+        self.pages = 0
+        self.created = time.time()
+        self.checked_out_at: float | None = None
+
+
+class DriverPool:
+    """
+    Fixed number of slots, each holding at most one warm Chrome.
+    Drivers are checked out per page and returned afterwards; they are
+    health-checked on checkout and recycled after max_pages or max_memory_mb.
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[int, str | None], "webdriver.Chrome"],
+        size: int,
+        max_pages: int,
+        max_memory_mb: int,
+        verbose: bool = False,
+        track_network: bool = False,
+        profiles: ProfileDirs | None = None,
+    ) -> None:
+        self._factory = factory
+        self._profiles = profiles
+        self.size = max(1, int(size))
+        self.max_pages = int(max_pages)
+        self.max_memory_mb = int(max_memory_mb)
+        self.verbose = verbose
+        self.track_network = track_network
+
+        self._cond = threading.Condition()
+        self._idle: list[PooledDriver] = []
+        self._free_slots: list[int] = list(range(self.size))
+        self._busy: set[PooledDriver] = set()
+        self._closed = False
+
+        self.stats = {"launched": 0, "reused": 0, "recycled": 0, "unhealthy": 0, "killed": 0}
+
+    def _v(self, msg: str) -> None:
+        if self.verbose:
+            print(f"[VERBOSE] {msg}")
+
+    def _healthy(self, pd: PooledDriver) -> bool:
+        try:
+            pd.driver.execute_script("return 1;")
+            return True
+        except Exception:
+            return False
+
+    def _needs_recycle(self, pd: PooledDriver) -> bool:
+        if self.max_pages > 0 and pd.pages >= self.max_pages:
+            self._v(f"Recycling driver slot={pd.slot} after {pd.pages} page(s)")
+            return True
+        if self.max_memory_mb > 0:
+            mb = driver_memory_mb(pd.driver)
+            if mb >= self.max_memory_mb:
+                self._v(f"Recycling driver slot={pd.slot} at {mb:.0f} MB")
+                return True
+        return False
+
+    def _release_slot(self, slot: int) -> None:
+        with self._cond:
+            self._free_slots.append(slot)
+            self._cond.notify()
+
+    def _destroy(self, pd: PooledDriver) -> None:
+        with self._cond:
+            if pd.dead:
+                return
+            pd.dead = True
+            self._busy.discard(pd)
+        _quit_driver(pd.driver)
+        if pd.profile_dir and self._profiles is not None:
+            self._profiles.release(pd.profile_dir)
+        self._release_slot(pd.slot)
+
+    def _launch(self, slot: int) -> PooledDriver:
+        profile_dir = self._profiles.acquire() if self._profiles is not None else None
+        try:
+            driver = self._factory(slot, profile_dir)
+        except Exception:
+            if profile_dir:
+                self._profiles.release(profile_dir)
+            raise
+        return PooledDriver(driver, slot, profile_dir)
+
+    def checkout(self) -> PooledDriver:
+        while True:
+            slot: int | None = None
+            pd: PooledDriver | None = None
+
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle:
+                        pd = self._idle.pop()
+                        break
+                    if self._free_slots:
+                        slot = self._free_slots.pop(0)
+                        break
+                    self._cond.wait()
+
+            if pd is not None:
+                if not self._healthy(pd):
+                    self._v(f"Driver slot={pd.slot} failed health check; replacing")
+                    self.stats["unhealthy"] += 1
+                    self._destroy(pd)
+                    continue
+                self.stats["reused"] += 1
+            else:
+                try:
+                    pd = self._launch(slot)
+                except Exception:
+                    self._release_slot(slot)
+                    raise
+                self.stats["launched"] += 1
+                self._v(f"Launched driver slot={slot}")
+
+            pd.checked_out_at = time.time()
+            with self._cond:
+                self._busy.add(pd)
+            return pd
+
+    def kill(self, pd: PooledDriver) -> None:
+        """
+        Watchdog path for a wedged driver: kill its processes instead of quit(),
+        and free the slot immediately. A later checkin() of pd is a no-op.
+        """
+        with self._cond:
+            if pd.dead:
+                return
+            pd.dead = True
+            self._busy.discard(pd)
+
+        tree_gone = kill_driver_processes(pd.driver)
+        self.stats["killed"] += 1
+        self._v(f"Killed wedged driver slot={pd.slot}")
+
+        # If Chrome might still be alive, keep its profile dir out of rotation.
+        if pd.profile_dir and self._profiles is not None and tree_gone:
+            self._profiles.release(pd.profile_dir)
+        self._release_slot(pd.slot)
+
+    def checkin(self, pd: PooledDriver, broken: bool = False) -> None:
+        if pd.dead:
+            return
+        pd.pages += 1
+        pd.checked_out_at = None
+
+        if self.track_network and not broken:
+            collect_network_stats(pd.driver)
+
+        if broken or self._closed or self._needs_recycle(pd):
+            if not broken and not self._closed:
+                self.stats["recycled"] += 1
+            self._destroy(pd)
+            return
+
+        # Park on a blank page so players/websockets stop while idle.
+        try:
+            pd.driver.get("about:blank")
+        except Exception:
+            self._destroy(pd)
+            return
+
+        with self._cond:
+            if pd.dead:
+                return
+            self._busy.discard(pd)
+            self._idle.append(pd)
+            self._cond.notify()
+
+    @contextmanager
+    def lease(self) -> Iterator[PooledDriver]:
+        from selenium.common.exceptions import WebDriverException
+
+        pd = self.checkout()
+        broken = False
+        try:
+            yield pd
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.checkin(pd, broken=broken)
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pd in idle:
+            self._destroy(pd)
+
+
+_pool: DriverPool | None = None
+_pool_key: tuple[Any, ...] | None = None
+_pool_lock = threading.Lock()
+
+
+def _pool_key_for(cfg: dict[str, Any]) -> tuple[Any, ...]:
+    return (
+        int(cfg["SCRAPE_WORKERS"]),
+        str(cfg["PAGE_LOAD_STRATEGY"]),
+        int(cfg["PAGE_LOAD_TIMEOUT_SECONDS"]),
+        int(cfg["DRIVER_MAX_PAGES"]),
+        int(cfg["DRIVER_MAX_MEMORY_MB"]),
+        bool(cfg["NETWORK_BLOCKING"]),
+        tuple(blocked_url_patterns(cfg)),
+        bool(cfg["BROWSER_PROFILE_CACHE"]),
+        str(cfg["BROWSER_PROFILE_DIR"]),
+        int(cfg["BROWSER_PROFILE_MAX_MB"]),
+    )
+
+
+def get_driver_pool(cfg: dict[str, Any]) -> DriverPool:
+    """
+    Returns the process-wide pool, shared by every batch and run mode.
+    A config change that affects how drivers are built replaces the pool.
+    """
+    global _pool, _pool_key
+
+    key = _pool_key_for(cfg)
+    old: DriverPool | None = None
+
+    with _pool_lock:
+        if _pool is not None and _pool_key == key:
+            return _pool
+
+        snapshot = dict(cfg)
+        old = _pool
+        _pool = DriverPool(
+            lambda slot, profile_dir: make_driver(snapshot, profile_dir=profile_dir),
+            size=int(cfg["SCRAPE_WORKERS"]),
+            max_pages=int(cfg["DRIVER_MAX_PAGES"]),
+            max_memory_mb=int(cfg["DRIVER_MAX_MEMORY_MB"]),
+            verbose=bool(cfg.get("VERBOSE", False)),
+            track_network=bool(cfg["NETWORK_BLOCKING"]),
+            profiles=get_profile_dirs(cfg),
+        )
+        _pool_key = key
+        pool = _pool
+
+    if old is not None:
+        old.close()
+    return pool
+
+
+def shutdown_driver_pool() -> None:
+    global _pool, _pool_key
+    with _pool_lock:
+        pool = _pool
+        _pool = None
+        _pool_key = None
+    if pool is not None:
+        pool.close()
+
+
+atexit.register(shutdown_driver_pool)
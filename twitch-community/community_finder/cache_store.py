@@ -0,0 +1,694 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Protocol
+
+from .locks import locked_file
+from .paths import DISCORD_CACHE_PATH, DISCORD_CACHE_DB_PATH, DISCORD_CACHE_LOCK_PATH
+from .resp import RespClient, RespError
+from .state import (
+    load_discord_cache,
+    save_discord_cache,
+    DISCORD_CACHE_TTL_SECONDS,
+    DISCORD_EMPTY_CACHE_TTL_SECONDS,
+    DISCORD_FAILED_CACHE_TTL_SECONDS,
+    OUTCOME_STATUS,
+    STATUS_EMPTY,
+    STATUS_FAILED,
+    STATUS_FOUND,
+)
+
+# Cache entries are plain dicts keyed by login.lower():
+# {"ts": float, "links": [...], "outcome": str, "status": str, "attempts": int, "ttl": float}
+
+# Lifetime counters kept by each store (hits/misses are reported by the caller).
+COUNTER_KEYS = ("hits", "misses", "purged", "evicted")
+# Per-host bookkeeping on an entry; left out when entries are shared or exported.
+LOCAL_FIELDS = ("hits", "seen")
+# JsonCacheStore: hit-only touches (seen/hits) ride along with the next real
+# write, and only force a rewrite of the whole file once they are this old.
+JSON_TOUCH_FLUSH_SECONDS = 300
+
+
+def entry_status(entry: dict[str, Any]) -> str:
+    status = entry.get("status")
+    if isinstance(status, str):
+        return status
+    # Entries written before statuses existed
+    if entry.get("outcome") in OUTCOME_STATUS:
+        return OUTCOME_STATUS[entry["outcome"]]
+    links = entry.get("links")
+    return STATUS_FOUND if isinstance(links, list) and links else STATUS_EMPTY
+
+
+def entry_ttl_seconds(entry: dict[str, Any]) -> float:
+    ttl = entry.get("ttl")
+    if isinstance(ttl, (int, float)):
+        return float(ttl)
+    status = entry_status(entry)
+    if status == STATUS_FOUND:
+        return DISCORD_CACHE_TTL_SECONDS
+    if status == STATUS_FAILED:
+        return DISCORD_FAILED_CACHE_TTL_SECONDS
+    return DISCORD_EMPTY_CACHE_TTL_SECONDS
+
+
+def entry_expires_at(entry: dict[str, Any]) -> float:
+    """When the entry stops being served; malformed entries are already expired."""
+    ts = entry.get("ts")
+    if not isinstance(ts, (int, float)) or not isinstance(entry.get("links"), list):
+        return 0.0
+    return float(ts) + entry_ttl_seconds(entry)
+
+
+def _entry_bytes(key: str, entry: dict[str, Any]) -> int:
+    return len(key) + len(json.dumps(entry))
+
+
+def _seen_of(entry: dict[str, Any]) -> float:
+    seen = entry.get("seen", entry.get("ts", 0.0))
+    return float(seen) if isinstance(seen, (int, float)) else 0.0
+
+
+def _entry_ts(entry: Any) -> float:
+    ts = entry.get("ts") if isinstance(entry, dict) else None
+    return float(ts) if isinstance(ts, (int, float)) else 0.0
+
+
+class JsonCacheStore:
+    """
+    The original discord_cache.json, held in memory. flush() merges this
+    process's changes into whatever is on disk (newer "ts" wins per login)
+    under a file lock, so concurrent instances share one file. A batch that
+    was served entirely from cache only bumps seen/hits; those wait for the
+    next write (or JSON_TOUCH_FLUSH_SECONDS, or close()) instead of
+    rewriting the file after every batch.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._data: dict[str, Any] = {k: v for k, v in load_discord_cache().items() if isinstance(v, dict)}
+        # Changes since the last flush: logins written/touched, and logins dropped (-> ts of the dropped entry).
+        self._changed: set[str] = set()
+        self._deleted: dict[str, float] = {}
+        # Logins only read since the last flush, and when the oldest such read happened.
+        self._touched: set[str] = set()
+        self._touched_since = 0.0
+        self._rewrite = False
+        self._counters = dict.fromkeys(COUNTER_KEYS, 0)
+
+    def _seen(self, key: str) -> float:
+        return _seen_of(self._data[key])
+
+    def _drop(self, key: str) -> None:
+        self._deleted[key] = max(self._deleted.get(key, 0.0), _entry_ts(self._data.pop(key)))
+        self._changed.discard(key)
+        self._touched.discard(key)
+
+    def get(self, key: str, touch: bool = True) -> dict[str, Any] | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if isinstance(entry, dict) and touch:
+                entry["seen"] = time.time()
+                entry["hits"] = int(entry.get("hits", 0)) + 1
+                if not self._touched:
+                    self._touched_since = entry["seen"]
+                self._touched.add(key)
+        return entry if isinstance(entry, dict) else None
+
+    def get_many(self, keys: list[str], touch: bool = True) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        for k in keys:
+            entry = self.get(k, touch)
+            if entry is not None:
+                out[k] = entry
+        return out
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        self.put_many({key: entry})
+
+    def put_many(self, items: dict[str, dict[str, Any]]) -> None:
+        now = time.time()
+        with self._lock:
+            for k, v in items.items():
+                old = self._data.get(k) or {}
+                self._data[k] = {**v, "seen": now, "hits": int(old.get("hits", 0))}
+                self._changed.add(k)
+                self._deleted.pop(k, None)
+
+    def items(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        with self._lock:
+            snapshot = list(self._data.items())
+        for k, v in snapshot:
+            yield k, v
+
+    def count(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(_entry_bytes(k, v) for k, v in self._data.items())
+
+    def purge_expired(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock:
+            dead = [k for k, v in self._data.items() if entry_expires_at(v) < now]
+            for k in dead:
+                self._drop(k)
+            self._counters["purged"] += len(dead)
+        return len(dead)
+
+    def evict(self, max_entries: int = 0, max_bytes: int = 0) -> int:
+        """Drops least recently used entries until both bounds hold (0 = no bound)."""
+        with self._lock:
+            order = sorted(self._data, key=self._seen)
+            n_over = max(0, len(order) - max_entries) if max_entries > 0 else 0
+            victims = order[:n_over]
+            if max_bytes > 0:
+                total = sum(_entry_bytes(k, v) for k, v in self._data.items())
+                total -= sum(_entry_bytes(k, self._data[k]) for k in victims)
+                for k in order[n_over:]:
+                    if total <= max_bytes:
+                        break
+                    total -= _entry_bytes(k, self._data[k])
+                    victims.append(k)
+            for k in victims:
+                self._drop(k)
+            self._counters["evicted"] += len(victims)
+        return len(victims)
+
+    def compact(self) -> None:
+        with self._lock:
+            self._rewrite = True
+        self.flush()
+
+    def add_counters(self, **deltas: int) -> None:
+        with self._lock:
+            for k, n in deltas.items():
+                self._counters[k] = self._counters.get(k, 0) + int(n)
+
+    def counters(self) -> dict[str, int]:
+        # Only this process's: the JSON file has nowhere to keep them.
+        with self._lock:
+            return dict(self._counters)
+
+    def flush(self) -> None:
+        self._flush(force=False)
+
+    def _flush(self, force: bool) -> None:
+        with self._lock:
+            touches_due = bool(self._touched) and (
+                force or time.time() - self._touched_since >= JSON_TOUCH_FLUSH_SECONDS
+            )
+            if not (self._changed or self._deleted or self._rewrite or touches_due):
+                return
+            self._changed |= self._touched
+            self._touched.clear()
+            changed = {k: dict(self._data[k]) for k in self._changed if k in self._data}
+            deleted = dict(self._deleted)
+            self._changed.clear()
+            self._deleted.clear()
+            self._rewrite = False
+
+        with locked_file(DISCORD_CACHE_LOCK_PATH):
+            merged = {k: v for k, v in load_discord_cache().items() if isinstance(v, dict)}
+            for k, ts in deleted.items():
+                # Someone else may have rescraped it meanwhile; only drop what we dropped.
+                if k in merged and _entry_ts(merged[k]) <= ts:
+                    del merged[k]
+            for k, mine in changed.items():
+                theirs = merged.get(k)
+                if theirs is not None and _entry_ts(theirs) > _entry_ts(mine):
+                    mine = {**theirs, "seen": max(_seen_of(theirs), _seen_of(mine)), "hits": mine.get("hits", 0)}
+                merged[k] = mine
+            save_discord_cache(merged)
+
+        # Adopt other instances' entries, keeping anything changed here since the snapshot.
+        with self._lock:
+            for k in list(self._data):
+                if k not in merged and k not in self._changed and k not in self._touched:
+                    del self._data[k]
+            for k, v in merged.items():
+                if k not in self._changed and k not in self._deleted and k not in self._touched:
+                    self._data[k] = v
+
+    def close(self) -> None:
+        self._flush(force=True)
+
+
+# Columns added after the first release of discord_cache.db.
+_ADDED_COLUMNS = {
+    "expires": "REAL NOT NULL DEFAULT 0",
+    "last_access": "REAL NOT NULL DEFAULT 0",
+    "hits": "INTEGER NOT NULL DEFAULT 0",
+}
+
+
+class SqliteCacheStore:
+    """
+    Indexed embedded cache: point lookups and per-entry upserts, each in its
+    own short transaction, so I/O scales with entries touched, not cache size.
+    Last-access times and counters are buffered and written by flush().
+    """
+
+    def __init__(self, path: str = DISCORD_CACHE_DB_PATH) -> None:
+        self.path = path
+        self._lock = threading.RLock()
+        # login -> (last access, lookups) not yet written
+        self._touched: dict[str, tuple[float, int]] = {}
+        self._pending_counters = dict.fromkeys(COUNTER_KEYS, 0)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS discord_cache ("
+            " login TEXT PRIMARY KEY,"
+            " ts REAL NOT NULL,"
+            " data TEXT NOT NULL,"
+            " expires REAL NOT NULL DEFAULT 0,"
+            " last_access REAL NOT NULL DEFAULT 0,"
+            " hits INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._upgrade_schema()
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_discord_cache_ts ON discord_cache(ts)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_discord_cache_expires ON discord_cache(expires)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_discord_cache_last_access ON discord_cache(last_access)")
+        self._migrate_json()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _upgrade_schema(self) -> None:
+        # Databases from older versions: add missing columns (and backfill expiry/LRU data).
+        def columns() -> set[str]:
+            return {row[1] for row in self._conn.execute("PRAGMA table_info(discord_cache)")}
+
+        if set(_ADDED_COLUMNS) <= columns():
+            return
+        with self._lock, self._transaction() as conn:
+            cols = columns()  # another instance may have upgraded it while we waited
+            for name, decl in _ADDED_COLUMNS.items():
+                if name not in cols:
+                    conn.execute(f"ALTER TABLE discord_cache ADD COLUMN {name} {decl}")
+            if "expires" not in cols:
+                rows = conn.execute("SELECT login, ts, data FROM discord_cache").fetchall()
+                conn.executemany(
+                    "UPDATE discord_cache SET expires = ?, last_access = ? WHERE login = ?",
+                    [(entry_expires_at(self._decode(data) or {}), ts, login) for login, ts, data in rows],
+                )
+
+    def _meta_get(self, key: str) -> str | None:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _migrate_json(self) -> None:
+        # One-time import of an existing discord_cache.json (the file is left in place).
+        with self._lock:
+            if self._meta_get("json_migrated") is not None:
+                return
+            data = load_discord_cache() if os.path.exists(DISCORD_CACHE_PATH) else {}
+            rows = [
+                (k.lower(), float(v["ts"]), json.dumps(v), entry_expires_at(v), float(v["ts"]))
+                for k, v in data.items()
+                if isinstance(k, str) and isinstance(v, dict) and isinstance(v.get("ts"), (int, float))
+            ]
+            with self._transaction() as conn:
+                # Re-checked under the write lock: another instance may have just migrated.
+                if self._meta_get("json_migrated") is not None:
+                    return
+                conn.executemany(
+                    "INSERT OR IGNORE INTO discord_cache (login, ts, data, expires, last_access) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)", (str(time.time()),)
+                )
+
+    @staticmethod
+    def _decode(data: str) -> dict[str, Any] | None:
+        try:
+            entry = json.loads(data)
+        except ValueError:
+            return None
+        return entry if isinstance(entry, dict) else None
+
+    def get(self, key: str, touch: bool = True) -> dict[str, Any] | None:
+        """
+        The entry plus "hits": how often it has been looked up. touch=False
+        reads it without counting a lookup or refreshing its LRU position.
+        """
+        with self._lock:
+            row = self._conn.execute("SELECT data, hits FROM discord_cache WHERE login = ?", (key,)).fetchone()
+            if not row:
+                return None
+            _, pending_hits = self._touched.get(key, (0.0, 0))
+            if touch:
+                pending_hits += 1
+                self._touched[key] = (time.time(), pending_hits)
+        entry = self._decode(row[0])
+        if entry is not None:
+            entry["hits"] = int(row[1]) + pending_hits
+        return entry
+
+    def get_many(self, keys: list[str], touch: bool = True) -> dict[str, dict[str, Any]]:
+        out: dict[str, dict[str, Any]] = {}
+        with self._lock:
+            for k in keys:
+                entry = self.get(k, touch)
+                if entry is not None:
+                    out[k] = entry
+        return out
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        self.put_many({key: entry})
+
+    def put_many(self, items: dict[str, dict[str, Any]]) -> None:
+        now = time.time()
+        rows = [(k, float(v.get("ts", now)), json.dumps(v), entry_expires_at(v), now) for k, v in items.items()]
+        if not rows:
+            return
+        with self._lock, self._transaction() as conn:
+            conn.executemany(
+                "INSERT INTO discord_cache (login, ts, data, expires, last_access) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(login) DO UPDATE SET ts = excluded.ts, data = excluded.data, "
+                "expires = excluded.expires, last_access = excluded.last_access "
+                # Another instance may have stored a newer scrape since this one started.
+                "WHERE excluded.ts >= discord_cache.ts",
+                rows,
+            )
+
+    def items(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT login, data FROM discord_cache").fetchall()
+        for login, data in rows:
+            entry = self._decode(data)
+            if entry is not None:
+                yield login, entry
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM discord_cache").fetchone()[0])
+
+    def size_bytes(self) -> int:
+        """Payload bytes (keys + JSON), not the file size: comparable across backends."""
+        with self._lock:
+            row = self._conn.execute("SELECT COALESCE(SUM(LENGTH(login) + LENGTH(data)), 0) FROM discord_cache")
+            return int(row.fetchone()[0])
+
+    def purge_expired(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock, self._transaction() as conn:
+            n = conn.execute("DELETE FROM discord_cache WHERE expires < ?", (now,)).rowcount
+            self._pending_counters["purged"] += n
+        return n
+
+    def evict(self, max_entries: int = 0, max_bytes: int = 0) -> int:
+        """Drops least recently used entries until both bounds hold (0 = no bound)."""
+        if max_entries <= 0 and max_bytes <= 0:
+            return 0
+        self._write_touched()
+        with self._lock, self._transaction() as conn:
+            n = 0
+            if max_entries > 0:
+                over = int(conn.execute("SELECT COUNT(*) FROM discord_cache").fetchone()[0]) - max_entries
+                if over > 0:
+                    n += conn.execute(
+                        "DELETE FROM discord_cache WHERE login IN "
+                        "(SELECT login FROM discord_cache ORDER BY last_access ASC LIMIT ?)",
+                        (over,),
+                    ).rowcount
+            if max_bytes > 0:
+                row = conn.execute("SELECT COALESCE(SUM(LENGTH(login) + LENGTH(data)), 0) FROM discord_cache")
+                excess = int(row.fetchone()[0]) - max_bytes
+                if excess > 0:
+                    victims: list[tuple[str]] = []
+                    for login, size in conn.execute(
+                        "SELECT login, LENGTH(login) + LENGTH(data) FROM discord_cache ORDER BY last_access ASC"
+                    ):
+                        if excess <= 0:
+                            break
+                        victims.append((login,))
+                        excess -= int(size)
+                    conn.executemany("DELETE FROM discord_cache WHERE login = ?", victims)
+                    n += len(victims)
+            self._pending_counters["evicted"] += n
+        return n
+
+    def compact(self) -> None:
+        self.flush()
+        with self._lock:
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self._conn.execute("VACUUM")
+
+    def add_counters(self, **deltas: int) -> None:
+        with self._lock:
+            for k, n in deltas.items():
+                self._pending_counters[k] = self._pending_counters.get(k, 0) + int(n)
+
+    def counters(self) -> dict[str, int]:
+        """Lifetime totals across runs, including what has not been flushed yet."""
+        with self._lock:
+            out = {}
+            for k, pending in self._pending_counters.items():
+                stored = self._meta_get(f"counter_{k}")
+                out[k] = (int(stored) if stored and stored.isdigit() else 0) + pending
+            return out
+
+    def _write_touched(self) -> None:
+        with self._lock:
+            touched = list(self._touched.items())
+            self._touched.clear()
+            if not touched:
+                return
+            with self._transaction() as conn:
+                conn.executemany(
+                    "UPDATE discord_cache SET last_access = MAX(last_access, ?), hits = hits + ? WHERE login = ?",
+                    [(t, n, k) for k, (t, n) in touched],
+                )
+
+    def flush(self) -> None:
+        # Entries are committed by put(); only access times and counters are pending.
+        self._write_touched()
+        with self._lock:
+            pending = [(f"counter_{k}", str(n)) for k, n in self._pending_counters.items() if n]
+            if not pending:
+                return
+            with self._transaction() as conn:
+                # Added, not overwritten, so concurrent processes don't lose each other's counts.
+                conn.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET "
+                    "value = CAST(CAST(meta.value AS INTEGER) + CAST(excluded.value AS INTEGER) AS TEXT)",
+                    pending,
+                )
+            self._pending_counters = dict.fromkeys(self._pending_counters, 0)
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self._conn.close()
+
+
+class SharedCacheStore:
+    """
+    A cache shared by every finder host over the Redis protocol, with this
+    host's own store in front of it as a read-through cache: fresh local
+    entries never leave the machine, misses and expired entries ask the
+    server, and writes go to both. Expiry and memory limits on the shared
+    side are left to the server (keys carry a TTL). While the server is
+    unreachable the local store carries on alone.
+    """
+
+    RETRY_SECONDS = 30.0
+
+    def __init__(self, client: RespClient, local: "CacheStore", retain_seconds: float, prefix: str) -> None:
+        self.client = client
+        self.local = local
+        self.retain_seconds = float(retain_seconds)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._pending_counters: dict[str, int] = {}
+        self.shared_stats = {"shared_hits": 0, "shared_misses": 0, "shared_errors": 0}
+
+    def _key(self, login: str) -> str:
+        return f"{self.prefix}entry:{login}"
+
+    def _remote(self, commands: list[tuple[Any, ...]]) -> list[Any] | None:
+        """Replies, or None if the server is (recently found to be) unreachable."""
+        if time.time() < self._down_until:
+            return None
+        try:
+            return self.client.pipeline(commands)
+        except (OSError, ValueError, RespError):
+            with self._lock:
+                self._down_until = time.time() + self.RETRY_SECONDS
+                self.shared_stats["shared_errors"] += 1
+            return None
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.shared_stats[key] += 1
+
+    def get(self, key: str, touch: bool = True) -> dict[str, Any] | None:
+        return self.get_many([key], touch).get(key)
+
+    def get_many(self, keys: list[str], touch: bool = True) -> dict[str, dict[str, Any]]:
+        """Local entries first; every miss or expired entry in the batch is asked for in one MGET."""
+        now = time.time()
+        out: dict[str, dict[str, Any]] = {}
+        ask: list[str] = []
+        for k in dict.fromkeys(keys):
+            entry = self.local.get(k, touch)
+            if entry is not None:
+                out[k] = entry
+            if entry is None or entry_expires_at(entry) < now:
+                ask.append(k)
+        if not ask:
+            return out
+
+        replies = self._remote([("MGET", *(self._key(k) for k in ask))])
+        raws = replies[0] if replies and isinstance(replies[0], list) else [None] * len(ask)
+        fetched: dict[str, dict[str, Any]] = {}
+        for k, raw in zip(ask, raws):
+            shared = None
+            if isinstance(raw, bytes):
+                try:
+                    shared = json.loads(raw)
+                except ValueError:
+                    shared = None
+            entry = out.get(k)
+            if not isinstance(shared, dict) or (entry is not None and _entry_ts(shared) <= _entry_ts(entry)):
+                self._count("shared_misses")
+                continue
+
+            # Another host scraped it more recently: keep a local copy for next time.
+            self._count("shared_hits")
+            fetched[k] = shared
+            out[k] = {**shared, "hits": int(entry.get("hits", 0)) if entry else 0}
+        if fetched:
+            self.local.put_many(fetched)
+        return out
+
+    def put(self, key: str, entry: dict[str, Any]) -> None:
+        self.put_many({key: entry})
+
+    def put_many(self, items: dict[str, dict[str, Any]]) -> None:
+        self.local.put_many(items)
+        now = time.time()
+        commands: list[tuple[Any, ...]] = []
+        for k, v in items.items():
+            ttl_ms = int((entry_expires_at(v) + self.retain_seconds - now) * 1000)
+            if ttl_ms > 0:
+                portable = {f: x for f, x in v.items() if f not in LOCAL_FIELDS}
+                commands.append(("SET", self._key(k), json.dumps(portable), "PX", ttl_ms))
+        if commands:
+            self._remote(commands)
+
+    # Local maintenance and inspection: the server manages its own copy.
+    def items(self) -> Iterator[tuple[str, dict[str, Any]]]:
+        return self.local.items()
+
+    def count(self) -> int:
+        return self.local.count()
+
+    def size_bytes(self) -> int:
+        return self.local.size_bytes()
+
+    def purge_expired(self, now: float | None = None) -> int:
+        return self.local.purge_expired(now)
+
+    def evict(self, max_entries: int = 0, max_bytes: int = 0) -> int:
+        return self.local.evict(max_entries, max_bytes)
+
+    def compact(self) -> None:
+        self.local.compact()
+
+    def add_counters(self, **deltas: int) -> None:
+        self.local.add_counters(**deltas)
+        with self._lock:
+            for k, n in deltas.items():
+                self._pending_counters[k] = self._pending_counters.get(k, 0) + int(n)
+
+    def counters(self) -> dict[str, int]:
+        """This host's lifetime counters, plus this process's traffic to the shared server."""
+        with self._lock:
+            return {**self.local.counters(), **self.shared_stats}
+
+    def fleet_counters(self) -> dict[str, int] | None:
+        replies = self._remote([("GET", f"{self.prefix}counter:{k}") for k in COUNTER_KEYS])
+        if replies is None:
+            return None
+        return {k: int(r) if isinstance(r, bytes) and r.isdigit() else 0 for k, r in zip(COUNTER_KEYS, replies)}
+
+    def flush(self) -> None:
+        self.local.flush()
+        with self._lock:
+            pending = {k: n for k, n in self._pending_counters.items() if n}
+            self._pending_counters = {}
+        if pending and self._remote([("INCRBY", f"{self.prefix}counter:{k}", n) for k, n in pending.items()]) is None:
+            # Server unreachable: keep them for the next flush.
+            with self._lock:
+                for k, n in pending.items():
+                    self._pending_counters[k] = self._pending_counters.get(k, 0) + n
+
+    def close(self) -> None:
+        self.flush()
+        self.local.close()
+        self.client.close()
+
+
+class CacheStore(Protocol):
+    """What discord.py needs from a cache backend."""
+
+    def get(self, key: str, touch: bool = True) -> dict[str, Any] | None: ...
+    def get_many(self, keys: list[str], touch: bool = True) -> dict[str, dict[str, Any]]: ...
+    def put(self, key: str, entry: dict[str, Any]) -> None: ...
+    def put_many(self, items: dict[str, dict[str, Any]]) -> None: ...
+    def items(self) -> Iterator[tuple[str, dict[str, Any]]]: ...
+    def count(self) -> int: ...
+    def size_bytes(self) -> int: ...
+    def purge_expired(self, now: float | None = None) -> int: ...
+    def evict(self, max_entries: int = 0, max_bytes: int = 0) -> int: ...
+    def compact(self) -> None: ...
+    def add_counters(self, **deltas: int) -> None: ...
+    def counters(self) -> dict[str, int]: ...
+    def flush(self) -> None: ...
+    def close(self) -> None: ...
+
+
+def open_cache_store(cfg: dict[str, Any]) -> CacheStore:
+    """CACHE_BACKEND: json | sqlite | redis (shared server, with sqlite as the local layer)."""
+    backend = str(cfg.get("CACHE_BACKEND", "sqlite"))
+    if backend == "json":
+        return JsonCacheStore()
+    if backend == "redis":
+        return SharedCacheStore(
+            RespClient(str(cfg["CACHE_REDIS_URL"])),
+            SqliteCacheStore(),
+            retain_seconds=int(cfg.get("DISCORD_STALE_GRACE_SECONDS", 0)),
+            prefix=str(cfg["CACHE_REDIS_PREFIX"]),
+        )
+    return SqliteCacheStore()
+
+
+def maintain(store: CacheStore, cfg: dict[str, Any]) -> dict[str, int]:
+    """
+    Deletes entries expired for longer than DISCORD_STALE_GRACE_SECONDS (they may
+    still be served while revalidating), then evicts down to CACHE_MAX_ENTRIES / CACHE_MAX_MB.
+    """
+    purged = store.purge_expired(time.time() - int(cfg.get("DISCORD_STALE_GRACE_SECONDS", 0)))
+    evicted = store.evict(int(cfg.get("CACHE_MAX_ENTRIES", 0)), int(cfg.get("CACHE_MAX_MB", 0)) * 1024 * 1024)
+    return {"purged": purged, "evicted": evicted}
@@ -0,0 +1,150 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter
+
+from .state import load_config
+from .cache_store import SharedCacheStore, entry_status
+from .discord import cache_stats, get_cache_store, maintain_cache
+from .snapshot import SnapshotError, export_snapshot, import_snapshots, parse_age
+
+
+def _print_cache_stats() -> None:
+    store = get_cache_store()
+    st = cache_stats()
+    life = st["lifetime"]
+    lookups = life["hits"] + life["misses"]
+    rate = f"{life['hits'] / lookups * 100:.1f}%" if lookups else "n/a"
+    by_status = Counter(entry_status(e) for _, e in store.items())
+    print(f"Entries:  {st['entries']} ({', '.join(f'{k} {n}' for k, n in by_status.most_common()) or 'none'})")
+    print(f"Size:     {st['bytes'] / 1024:.1f} KB")
+    print(f"Hit rate: {rate} ({life['hits']} hits / {lookups} lookups)")
+    print(f"Purged:   {life['purged']} expired")
+    print(f"Evicted:  {life['evicted']} over size bounds")
+    if isinstance(store, SharedCacheStore):
+        print(
+            f"Shared:   {life['shared_hits']} hits / {life['shared_misses']} misses "
+            f"/ {life['shared_errors']} errors this run"
+        )
+        fleet = store.fleet_counters()
+        if fleet is None:
+            print("Fleet:    shared cache server unreachable")
+        else:
+            f_lookups = fleet["hits"] + fleet["misses"]
+            f_rate = f"{fleet['hits'] / f_lookups * 100:.1f}%" if f_lookups else "n/a"
+            print(f"Fleet:    hit rate {f_rate} ({fleet['hits']} hits / {f_lookups} lookups, all hosts)")
+
+
+def cache_command(action: str) -> None:
+    cfg = load_config()
+    store = get_cache_store()  # opening it already purges/evicts once
+
+    if action in ("purge", "compact"):
+        maintain_cache(cfg, store)
+        if action == "compact":
+            store.compact()
+        store.flush()
+        session = cache_stats()["session"]
+        print(f"Purged {session['purged']} expired, evicted {session['evicted']} over size bounds.")
+        print()
+
+    _print_cache_stats()
+    store.close()
+
+
+def snapshot_command(args: argparse.Namespace) -> None:
+    store = get_cache_store()
+    try:
+        max_age = parse_age(args.max_age) if args.max_age else None
+        t0 = time.perf_counter()
+        if args.action == "export":
+            n = export_snapshot(store, args.path, max_age)
+            size = os.path.getsize(args.path)
+            print(f"Exported {n} entries to {args.path} ({size / 1024:.1f} KB) in {time.perf_counter() - t0:.2f}s")
+        else:
+            st = import_snapshots(store, args.paths, max_age)
+            print(
+                f"Imported {st['imported']} of {st['read']} entries "
+                f"({st['skipped']} older or filtered out) in {time.perf_counter() - t0:.2f}s"
+            )
+    except (SnapshotError, OSError) as e:
+        print(f"Error: {e}")
+    finally:
+        store.close()
+
+
+# Runs in a fresh interpreter: everything `python main.py` does before showing the menu,
+# minus the background token fetch, which would time (and spend) a real Twitch request.
+_STARTUP_PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import community_finder.cli
+from community_finder.runners import App
+App(warm_token=False)
+print(json.dumps({"ms": (time.perf_counter() - t0) * 1000, "selenium": "selenium" in sys.modules}))
+"""
+
+
+def startup_bench(runs: int, max_ms: float | None) -> bool:
+    """Times startup (imports + App() construction) over several fresh processes; False if over budget."""
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    samples: list[float] = []
+    selenium_loaded = False
+    for _ in range(max(1, runs)):
+        out = subprocess.run(
+            [sys.executable, "-c", _STARTUP_PROBE], cwd=project_dir, capture_output=True, text=True, check=True
+        )
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(float(res["ms"]))
+        selenium_loaded = selenium_loaded or bool(res["selenium"])
+
+    med = statistics.median(samples)
+    print(f"Startup over {len(samples)} runs: median {med:.0f} ms, min {min(samples):.0f} ms, max {max(samples):.0f} ms")
+    ok = True
+    if selenium_loaded:
+        print("Selenium was imported at startup (should only load when a scrape needs a browser).")
+        ok = False
+    if max_ms is not None and med > max_ms:
+        print(f"Over budget: {med:.0f} ms > {max_ms:.0f} ms")
+        ok = False
+    return ok
+
+
+def main(argv: list[str] | None = None) -> bool:
+    """Handles command-line subcommands; returns False when there are none (run the menu)."""
+    parser = argparse.ArgumentParser(prog="main.py", description="Twitch community finder")
+    sub = parser.add_subparsers(dest="command")
+    cache = sub.add_parser("cache", help="Discord cache maintenance")
+    actions = cache.add_subparsers(dest="action", required=True)
+    actions.add_parser("stats", help="size and hit rate")
+    actions.add_parser("purge", help="drop expired and over-bound entries")
+    actions.add_parser("compact", help="purge and reclaim space")
+
+    age_help = "only entries scraped within this long (e.g. 3600, 12h, 7d)"
+    exp = actions.add_parser("export", help="write a compressed snapshot")
+    exp.add_argument("path")
+    exp.add_argument("--max-age", help=age_help)
+    imp = actions.add_parser("import", help="merge snapshots into the cache (newest entry wins)")
+    imp.add_argument("paths", nargs="+")
+    imp.add_argument("--max-age", help=age_help)
+
+    bench = sub.add_parser("startup-bench", help="measure time until the menu can be shown")
+    bench.add_argument("--runs", type=int, default=5)
+    bench.add_argument("--max-ms", type=float, help="exit with status 1 if the median is above this")
+
+    args = parser.parse_args(argv)
+    if args.command is None:
+        return False
+    if args.command == "startup-bench":
+        if not startup_bench(args.runs, args.max_ms):
+            raise SystemExit(1)
+    elif args.command == "cache":
+        if args.action in ("export", "import"):
+            snapshot_command(args)
+        else:
+            cache_command(args.action)
+    return True
@@ -1,56 +1,50 @@
-import re
+import asyncio
+import threading
 import time
 from typing import Any
 
-from concurrent.futures import ThreadPoolExecutor, as_completed
-
-from selenium import webdriver
-from selenium.common.exceptions import TimeoutException, WebDriverException
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
+from concurrent.futures import Future, InvalidStateError, wait
 
 from .state import (
-    load_discord_cache,
-    save_discord_cache,
+    load_config,
+    DISCORD_CACHE_PURGE_INTERVAL_SECONDS,
+    DISCORD_REFRESH_RETRY_SECONDS,
+    OUTCOME_FOUND,
+    OUTCOME_RENDERED_EMPTY,
+    OUTCOME_TIMED_OUT,
+    OUTCOME_ERROR,
+    OUTCOME_HARD_TIMEOUT,
+    OUTCOME_MISSING,
+    OUTCOME_STATUS,
+    STATUS_EMPTY,
+    STATUS_FAILED,
+    STATUS_FOUND,
+    STATUS_MISSING,
     DISCORD_CACHE_TTL_SECONDS,
+    DISCORD_CACHE_BACKOFF_FACTOR,
     DISCORD_EMPTY_CACHE_TTL_SECONDS,
+    DISCORD_EMPTY_CACHE_MAX_TTL_SECONDS,
+    DISCORD_FAILED_CACHE_TTL_SECONDS,
+    DISCORD_FAILED_CACHE_MAX_TTL_SECONDS,
+    DISCORD_MISSING_CACHE_TTL_SECONDS,
+    DISCORD_TIMED_OUT_AS_EMPTY_AFTER,
 )
-from .settings import load_settings
-
-
-DISCORD_URL_REGEX = re.compile(
-    r"""(?xi)
-    \bhttps?://
-    (?:
-        (?:www\.)?
-        discord\.gg/[A-Za-z0-9-]+
-      |
-        (?:www\.)?
-        discord\.com/invite/[A-Za-z0-9-]+
-      |
-        (?:www\.)?
-        discordapp\.com/invite/[A-Za-z0-9-]+
-    )
-    """
-)
+from .browser import get_driver_pool
+from .scheduler import ScrapeScheduler, ScrapeTask
+from .about_http import fetch_about_texts_batched, fetch_about_texts_batched_async
+from .invites import extract_discord_from_html
+from .cache_store import CacheStore, entry_expires_at, entry_status, maintain, open_cache_store
 
-DISCORD_BARE_REGEX = re.compile(
-    r"""(?xi)
-    \b(?:
-        discord\.gg/[A-Za-z0-9-]+
-      |
-        discord\.com/invite/[A-Za-z0-9-]+
-      |
-        discordapp\.com/invite/[A-Za-z0-9-]+
-    )\b
-    """
-)
 
-discord_cache: dict[str, Any] = load_discord_cache()
+_cache_store: CacheStore | None = None
+_cache_lock = threading.RLock()
+_last_maintenance = 0.0
 
+# This session's cache lookups and maintenance (lifetime totals live in the store).
+cache_session_stats: dict[str, int] = {"hits": 0, "misses": 0, "stale": 0, "refreshed": 0, "purged": 0, "evicted": 0}
 
-def _secrets() -> dict[str, str]:
-    return load_settings()
+# Why each scrape this session ended (outcome -> count).
+scrape_outcomes: dict[str, int] = {}
 
 
 def _v(cfg: dict[str, Any], msg: str) -> None:
@@ -58,190 +52,489 @@ def _v(cfg: dict[str, Any], msg: str) -> None:
         print(f"[VERBOSE] {msg}")
 
 
-def make_driver(cfg: dict[str, Any]) -> webdriver.Chrome:
-    s = _secrets()
+def get_cache_store() -> CacheStore:
+    """Opened on first use, with the backend chosen by CACHE_BACKEND in config.json."""
+    global _cache_store
+    with _cache_lock:
+        if _cache_store is None:
+            cfg = load_config()
+            _cache_store = open_cache_store(cfg)
+            maintain_cache(cfg, _cache_store)
+        return _cache_store
 
-    options = Options()
-    options.binary_location = s["CHROME_BINARY_PATH"]
-    options.page_load_strategy = str(cfg["PAGE_LOAD_STRATEGY"])
 
-    # Default to headless to avoid opening visible windows
-    options.add_argument("--headless=new")
+def maintain_cache(cfg: dict[str, Any], store: CacheStore | None = None) -> None:
+    """Purges expired entries and enforces CACHE_MAX_ENTRIES / CACHE_MAX_MB."""
+    global _last_maintenance
+    with _cache_lock:
+        store = store or get_cache_store()
+        _last_maintenance = time.time()
+        done = maintain(store, cfg)
+        for k, n in done.items():
+            cache_session_stats[k] += n
+    if any(done.values()):
+        _v(cfg, f"Discord cache maintenance: purged={done['purged']} evicted={done['evicted']}")
 
-    options.add_argument("--disable-gpu")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1400,900")
-    options.add_argument("--disable-notifications")
-    options.add_argument("--mute-audio")
 
-    prefs = {
-        "profile.managed_default_content_settings.images": 2,
-        "profile.default_content_setting_values.notifications": 2,
-    }
-    options.add_experimental_option("prefs", prefs)
+def _count_lookups(hits: int, misses: int, stale: int = 0) -> None:
+    with _cache_lock:
+        cache_session_stats["hits"] += hits
+        cache_session_stats["misses"] += misses
+        cache_session_stats["stale"] += stale
+    get_cache_store().add_counters(hits=hits, misses=misses)
 
-    service = Service(s["CHROMEDRIVER_PATH"])
 
-    # If this fails, we want to see it in verbose mode, not silently swallow it.
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.set_page_load_timeout(int(cfg["PAGE_LOAD_TIMEOUT_SECONDS"]))
-    return driver
+def cache_lookup_many(cfg: dict[str, Any], logins: list[str]) -> dict[str, tuple[list[str] | None, bool]]:
+    """
+    login -> (links, revalidate), from one store.get_many() (one round-trip
+    on a shared store). links is None on a miss. Entries with links that
+    expired less than DISCORD_STALE_GRACE_SECONDS ago are still served, and
+    flagged for a background rescrape; so are entries looked up at least
+    DISCORD_REFRESH_MIN_HITS times that expire within DISCORD_REFRESH_AHEAD_SECONDS.
+    """
+    entries = get_cache_store().get_many([x.lower() for x in logins])
+    now = time.time()
+    ahead = int(cfg.get("DISCORD_REFRESH_AHEAD_SECONDS", 0))
+    min_hits = int(cfg.get("DISCORD_REFRESH_MIN_HITS", 1))
+    grace = int(cfg.get("DISCORD_STALE_GRACE_SECONDS", 0))
+
+    out: dict[str, tuple[list[str] | None, bool]] = {}
+    hits = stale = 0
+    for login in logins:
+        entry = entries.get(login.lower())
+        expires = entry_expires_at(entry) if isinstance(entry, dict) else 0.0
+        if not expires:
+            out[login] = (None, False)
+            continue
+
+        links = [x for x in entry["links"] if isinstance(x, str)]
+        if expires >= now:
+            hits += 1
+            popular = int(entry.get("hits", 0)) >= min_hits
+            out[login] = (links, bool(ahead) and popular and (expires - now) <= ahead)
+        elif links and (now - expires) <= grace:
+            hits += 1
+            stale += 1
+            out[login] = (links, True)
+        else:
+            out[login] = (None, False)
 
+    _count_lookups(hits, len(logins) - hits, stale)
+    return out
 
-def _normalize_discord_url(u: str) -> str:
-    u = u.strip().strip("\"'")
-    if u.lower().startswith("http://") or u.lower().startswith("https://"):
-        return u
-    return "https://" + u
 
+def _record_outcome(outcome: str) -> None:
+    with _cache_lock:
+        scrape_outcomes[outcome] = scrape_outcomes.get(outcome, 0) + 1
+
+
+def _backoff_ttl(cfg: dict[str, Any], status: str, attempts: int) -> float:
+    """How long a result is served, given how many scrapes in a row ended this way."""
+    if status == STATUS_FOUND:
+        return DISCORD_CACHE_TTL_SECONDS
+    if status == STATUS_MISSING:
+        return DISCORD_MISSING_CACHE_TTL_SECONDS
+    if status == STATUS_EMPTY:
+        if not cfg.get("CACHE_EMPTY_RESULTS", True) and attempts < 2:
+            return 0.0
+        base, cap = DISCORD_EMPTY_CACHE_TTL_SECONDS, DISCORD_EMPTY_CACHE_MAX_TTL_SECONDS
+    else:
+        base, cap = DISCORD_FAILED_CACHE_TTL_SECONDS, DISCORD_FAILED_CACHE_MAX_TTL_SECONDS
+    return float(min(cap, base * DISCORD_CACHE_BACKOFF_FACTOR ** (max(1, attempts) - 1)))
+
+
+def cache_set(cfg: dict[str, Any], login: str, links: list[str], outcome: str | None = None) -> None:
+    store = get_cache_store()
+    key = login.lower()
+    status = STATUS_FOUND if links else OUTCOME_STATUS.get(outcome or "", STATUS_EMPTY)
+    prev = store.get(key, touch=False)
+
+    if status == STATUS_FAILED and outcome == OUTCOME_TIMED_OUT and isinstance(prev, dict):
+        # Usually a page that rendered without the selectors we wait for, not a network problem.
+        prev_status = entry_status(prev)
+        n = prev.get("attempts", 1)
+        repeated = prev_status == STATUS_FAILED and prev.get("outcome") == OUTCOME_TIMED_OUT
+        if prev_status == STATUS_EMPTY or (
+            repeated and (int(n) if isinstance(n, int) else 1) + 1 >= DISCORD_TIMED_OUT_AS_EMPTY_AFTER
+        ):
+            status = STATUS_EMPTY
+
+    # A failed rescrape must not replace links we already have (they stay servable while stale).
+    if status == STATUS_FAILED and isinstance(prev, dict) and prev.get("links"):
+        return
 
-def _extract_discord_from_html(html: str) -> list[str]:
-    found: set[str] = set()
-    for m in DISCORD_URL_REGEX.finditer(html or ""):
-        found.add(m.group(0))
-    for m in DISCORD_BARE_REGEX.finditer(html or ""):
-        found.add(_normalize_discord_url(m.group(0)))
-    return sorted(found)
+    attempts = 1
+    if isinstance(prev, dict) and entry_status(prev) == status:
+        n = prev.get("attempts", 1)
+        attempts = (int(n) if isinstance(n, int) else 1) + 1
+
+    ttl = _backoff_ttl(cfg, status, attempts)
+    entry: dict[str, Any] = {"ts": time.time(), "links": links, "status": status, "attempts": attempts, "ttl": ttl}
+    if outcome:
+        entry["outcome"] = outcome
+    store.put(key, entry)
+    if status != STATUS_FOUND:
+        _v(cfg, f"{login}: cached as {status} (attempt {attempts}, ttl {ttl / 60:.0f} min)")
+
+
+def _save_cache(cfg: dict[str, Any]) -> None:
+    store = get_cache_store()
+    if time.time() - _last_maintenance >= DISCORD_CACHE_PURGE_INTERVAL_SECONDS:
+        maintain_cache(cfg, store)
+    store.flush()
+    _v(cfg, "Discord cache flushed")
+
+
+def cache_stats() -> dict[str, Any]:
+    store = get_cache_store()
+    with _cache_lock:
+        session = dict(cache_session_stats)
+    lookups = session["hits"] + session["misses"]
+    return {
+        "entries": store.count(),
+        "bytes": store.size_bytes(),
+        "session": session,
+        "session_hit_rate": (session["hits"] / lookups) if lookups else None,
+        "lifetime": store.counters(),
+    }
 
 
-def extract_discord_links_from_about(driver: webdriver.Chrome, cfg: dict[str, Any], streamer_login: str) -> list[str]:
-    url = f"https://www.twitch.tv/{streamer_login}/about"
-    _v(cfg, f"Loading About page: {url}")
+def cache_stats_line() -> str:
+    st = cache_stats()
+    s = st["session"]
+    rate = "n/a" if st["session_hit_rate"] is None else f"{st['session_hit_rate'] * 100:.0f}%"
+    return (
+        f"Discord cache: {st['entries']} entries, {st['bytes'] / 1024:.0f} KB | "
+        f"hit rate {rate} ({s['hits']}/{s['hits'] + s['misses']}, {s['stale']} stale) | "
+        f"{s['refreshed']} background refreshes | "
+        f"purged {s['purged']}, evicted {s['evicted']}"
+    )
 
+
+def _run_scrape_task(task: ScrapeTask) -> tuple[list[str], str]:
+    # Selenium is only imported once something actually has to be rendered.
+    from selenium.common.exceptions import WebDriverException
+    from .about_selenium import extract_discord_about
+
+    cfg = task.cfg
+    pool = get_driver_pool(cfg)
     try:
-        driver.get(url)
-    except TimeoutException:
-        _v(cfg, f"Page load timeout for {streamer_login} (continuing)")
-    except WebDriverException as e:
-        _v(cfg, f"WebDriver error during get() for {streamer_login}: {e}")
-        return []
+        lease = pool.checkout()
+    except Exception as e:
+        _v(cfg, f"{task.login}: Driver failed to start: {e}")
+        return [], OUTCOME_ERROR
 
+    # The lease is visible to the watchdog before the deadline starts, so a timeout always finds it.
+    if not task.begin((pool, lease)):
+        pool.checkin(lease)
+        return [], OUTCOME_HARD_TIMEOUT
+
+    broken = False
     try:
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-    except WebDriverException:
-        pass
+        return extract_discord_about(lease.driver, cfg, task.login)
+    except Exception as e:
+        broken = isinstance(e, WebDriverException)
+        _v(cfg, f"{task.login}: Scrape failed: {e}")
+        return [], OUTCOME_ERROR
+    finally:
+        task.end()
+        pool.checkin(lease, broken=broken)
 
-    deadline = time.time() + int(cfg["DISCORD_WAIT_SECONDS"])
-    poll = float(cfg["DISCORD_POLL_INTERVAL_SECONDS"])
 
-    html = ""
-    while time.time() < deadline:
-        try:
-            html = driver.page_source or ""
-        except WebDriverException:
-            html = ""
-        lower = html.lower()
-        if ("discord.gg" in lower) or ("discord.com/invite" in lower) or ("discordapp.com/invite" in lower):
-            _v(cfg, f"Discord text detected in HTML for {streamer_login}")
-            break
-        time.sleep(poll)
-
-    found: set[str] = set()
-
-    # Pull from anchors
+def _kill_scrape_task(task: ScrapeTask) -> tuple[list[str], str]:
+    held = task.held()
+    _v(task.cfg, f"{task.login}: exceeded {task.timeout:.0f}s, killing its driver")
+    if held is not None:
+        pool, lease = held
+        pool.kill(lease)
+    return [], OUTCOME_HARD_TIMEOUT
+
+
+def _on_scrape_result(task: ScrapeTask, value: tuple[list[str], str]) -> None:
+    links, outcome = value
+    _record_outcome(outcome)
+    cache_set(task.cfg, task.login, links, outcome)
+
+
+_scheduler: ScrapeScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scrape_scheduler() -> ScrapeScheduler:
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = ScrapeScheduler(_run_scrape_task, _kill_scrape_task, _on_scrape_result)
+        return _scheduler
+
+
+# Single-flight: login.lower() -> future of the one scrape running for it.
+# Concurrent requests for the same channel (adjacent Helix pages, duplicate
+# names, overlapping pipeline batches) attach to that future.
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+singleflight_stats = {"started": 0, "saved": 0}
+
+
+def _resolve(fut: Future, value: Any) -> None:
     try:
-        anchors = driver.find_elements("tag name", "a")
-        for a in anchors:
-            href = a.get_attribute("href")
-            if href and (DISCORD_URL_REGEX.search(href) or DISCORD_BARE_REGEX.search(href)):
-                found.add(href)
-    except WebDriverException:
+        fut.set_result(value)
+    except InvalidStateError:
         pass
 
-    # Pull from HTML regex
-    for x in _extract_discord_from_html(html):
-        found.add(x)
 
-    out = sorted(found)
-    _v(cfg, f"Found {len(out)} Discord link(s) for {streamer_login}")
-    return out
+def _chain(src: Future, dst: Future) -> None:
+    def done(f: Future) -> None:
+        if f.cancelled():
+            dst.cancel()
+            return
+        e = f.exception()
+        try:
+            if e is not None:
+                dst.set_exception(e)
+            else:
+                dst.set_result(f.result())
+        except InvalidStateError:
+            pass
+
+    src.add_done_callback(done)
+
+
+def _claim_in_flight(logins: list[str]) -> tuple[dict[str, Future], list[str]]:
+    """
+    Returns a future per login plus the logins this caller now owns and must
+    resolve; the rest were already being scraped by someone else.
+    """
+    futs: dict[str, Future] = {}
+    owned: list[str] = []
+    with _inflight_lock:
+        for login in logins:
+            key = login.lower()
+            fut = _inflight.get(key)
+            if fut is not None:
+                singleflight_stats["saved"] += 1
+            else:
+                fut = Future()
+                _inflight[key] = fut
+                singleflight_stats["started"] += 1
+                owned.append(login)
+                fut.add_done_callback(lambda f, key=key: _release_in_flight(key, f))
+            futs[login] = fut
+    return futs, owned
+
+
+def _release_in_flight(key: str, fut: Future) -> None:
+    with _inflight_lock:
+        if _inflight.get(key) is fut:
+            del _inflight[key]
+
+
+def _scrape_http_fast_path(cfg: dict[str, Any], logins: list[str], futs: dict[str, Future]) -> list[str]:
+    """
+    Resolves what it can from Twitch's JSON data (no browser) into futs/cache.
+    Returns the logins that were inconclusive and still need the Selenium path.
+    """
+    missing: set[str] = set()
+    texts = fetch_about_texts_batched(
+        logins,
+        int(cfg["HTTP_BATCH_SIZE"]),
+        timeout=int(cfg["PAGE_LOAD_TIMEOUT_SECONDS"]),
+        missing=missing,
+    )
+    return _resolve_http_texts(cfg, logins, texts, missing, futs)
+
+
+def _resolve_http_texts(
+    cfg: dict[str, Any],
+    logins: list[str],
+    texts: dict[str, list[str] | None],
+    missing: set[str],
+    futs: dict[str, Future],
+) -> list[str]:
+    remaining: list[str] = []
+    for login in logins:
+        t = texts.get(login)
+        if login in missing:
+            links, outcome = [], OUTCOME_MISSING
+        elif t is None:
+            remaining.append(login)
+            continue
+        else:
+            links = extract_discord_from_html("\n".join(t))
+            outcome = OUTCOME_FOUND if links else OUTCOME_RENDERED_EMPTY
+        _record_outcome(outcome)
+        cache_set(cfg, login, links, outcome)
+        _resolve(futs[login], (links, outcome))
+
+    _v(cfg, f"HTTP backend resolved={len(logins) - len(remaining)} fallback={len(remaining)}")
+    return remaining
 
 
-def cache_get(login: str) -> list[str] | None:
-    entry = discord_cache.get(login.lower())
-    if not isinstance(entry, dict):
-        return None
+def _submit_to_scheduler(cfg: dict[str, Any], logins: list[str], futs: dict[str, Future], background: bool) -> None:
+    if logins:
+        kind = "background" if background else "todo"
+        _v(cfg, f"Discord scrape {kind}={len(logins)} workers={cfg['SCRAPE_WORKERS']}")
 
-    ts = entry.get("ts")
-    links = entry.get("links")
-    if not isinstance(ts, (int, float)) or not isinstance(links, list):
-        return None
+    # Every future resolves within SCRAPE_TIMEOUT_PER_CHANNEL of getting a driver (watchdog).
+    scheduler = get_scrape_scheduler()
+    for login in logins:
+        _chain(scheduler.submit(cfg, login, background=background), futs[login])
 
-    links_clean = [x for x in links if isinstance(x, str)]
-    ttl = DISCORD_EMPTY_CACHE_TTL_SECONDS if len(links_clean) == 0 else DISCORD_CACHE_TTL_SECONDS
-    if (time.time() - ts) > ttl:
-        return None
 
-    return links_clean
+def _fail_owned(owned: list[str], futs: dict[str, Future], error: BaseException) -> None:
+    # Never leave an owned future pending: others may be attached to it.
+    for login in owned:
+        fut = futs[login]
+        if fut.done():
+            continue
+        if isinstance(error, Exception):
+            try:
+                fut.set_exception(error)
+            except InvalidStateError:
+                pass  # resolved by a worker thread meanwhile
+        else:
+            fut.cancel()
 
 
-def cache_set(cfg: dict[str, Any], login: str, links: list[str]) -> None:
-    # IMPORTANT:
-    # If CACHE_EMPTY_RESULTS is True, we cache empty too (helps avoid rescraping dead ends and proves cache works).
-    if (not cfg.get("CACHE_EMPTY_RESULTS", True)) and len(links) == 0:
+def _start_scrapes(cfg: dict[str, Any], owned: list[str], futs: dict[str, Future], background: bool = False) -> None:
+    """HTTP fast path first (if enabled), then the scheduler; every owned future ends up resolved."""
+    try:
+        remaining = owned
+        if owned and cfg.get("SCRAPE_BACKEND") == "http":
+            remaining = _scrape_http_fast_path(cfg, owned, futs)
+        _submit_to_scheduler(cfg, remaining, futs, background)
+    except BaseException as e:
+        _fail_owned(owned, futs, e)
+        raise
+
+
+async def _start_scrapes_async(cfg: dict[str, Any], owned: list[str], futs: dict[str, Future]) -> None:
+    """_start_scrapes with the HTTP fast path and its cache writes kept off the event loop."""
+    try:
+        remaining = owned
+        if owned and cfg.get("SCRAPE_BACKEND") == "http":
+            missing: set[str] = set()
+            texts = await fetch_about_texts_batched_async(
+                owned,
+                int(cfg["HTTP_BATCH_SIZE"]),
+                timeout=int(cfg["PAGE_LOAD_TIMEOUT_SECONDS"]),
+                missing=missing,
+            )
+            remaining = await asyncio.to_thread(_resolve_http_texts, cfg, owned, texts, missing, futs)
+        _submit_to_scheduler(cfg, remaining, futs, background=False)
+    except BaseException as e:
+        _fail_owned(owned, futs, e)
+        raise
+
+
+_refresh_attempts: dict[str, float] = {}
+
+
+def revalidate_in_background(cfg: dict[str, Any], logins: list[str]) -> None:
+    """Low-priority rescrape of cached channels; results only land in the cache."""
+    now = time.time()
+    with _cache_lock:
+        due = [x for x in logins if now - _refresh_attempts.get(x.lower(), 0.0) >= DISCORD_REFRESH_RETRY_SECONDS]
+        for x in due:
+            _refresh_attempts[x.lower()] = now
+    if not due:
         return
-    discord_cache[login.lower()] = {"ts": time.time(), "links": links}
 
+    futs, owned = _claim_in_flight(due)
+    if not owned:
+        return
+    with _cache_lock:
+        cache_session_stats["refreshed"] += len(owned)
+    _v(cfg, f"Revalidating {len(owned)} cached channel(s) in the background")
+
+    def run() -> None:
+        try:
+            _start_scrapes(cfg, owned, {x: futs[x] for x in owned}, background=True)
+        except Exception as e:
+            _v(cfg, f"Background revalidation failed: {e}")
+            return
+        wait([futs[x] for x in owned])
+        _save_cache(cfg)
+
+    # A daemon thread, not an executor: interpreter exit must not wait on queued refreshes.
+    threading.Thread(target=run, name="discord-revalidate", daemon=True).start()
 
-def scrape_discord_for_logins_parallel(cfg: dict[str, Any], logins: list[str]) -> dict[str, list[str]]:
+
+def _split_cached(cfg: dict[str, Any], logins: list[str]) -> tuple[dict[str, list[str]], list[str]]:
+    """(results served from the cache, logins still to scrape); stale hits get revalidated."""
     results: dict[str, list[str]] = {}
     todo: list[str] = []
+    stale: list[str] = []
 
-    for login in logins:
-        cached = cache_get(login)
+    for login, (cached, revalidate) in cache_lookup_many(cfg, logins).items():
         if cached is not None:
             results[login] = cached
+            if revalidate:
+                stale.append(login)
         else:
             todo.append(login)
 
-    if not todo:
-        return results
+    if stale:
+        revalidate_in_background(cfg, stale)
+    return results, todo
 
-    _v(cfg, f"Discord scrape todo={len(todo)} cached={len(logins) - len(todo)} workers={cfg['SCRAPE_WORKERS']}")
 
-    def worker(one_login: str) -> tuple[str, list[str], str | None]:
-        # return (login, links, error_message)
-        try:
-            driver = make_driver(cfg)
-        except Exception as e:
-            return one_login, [], f"Driver failed to start: {e}"
+def _claim_foreground(todo: list[str]) -> tuple[dict[str, Future], list[str]]:
+    futs, owned = _claim_in_flight(todo)
+
+    if len(owned) < len(todo):
+        # Someone is waiting now: a queued background refresh for these gets a foreground slot.
+        scheduler = get_scrape_scheduler()
+        mine = set(owned)
+        for login in todo:
+            if login not in mine:
+                scheduler.promote(login)
+    return futs, owned
+
 
+def _collect(cfg: dict[str, Any], futs: dict[str, Future], results: dict[str, list[str]]) -> dict[str, list[str]]:
+    for login, fut in futs.items():
         try:
-            links = extract_discord_links_from_about(driver, cfg, one_login)
-            return one_login, links, None
+            links, _outcome = fut.result()
         except Exception as e:
-            return one_login, [], f"Scrape failed: {e}"
-        finally:
-            try:
-                driver.quit()
-            except Exception:
-                pass
+            _v(cfg, f"{login}: scrape exception: {e}")
+            links = []
+        results[login] = links
+    return results
 
-    max_workers = int(cfg["SCRAPE_WORKERS"])
-    per_channel_timeout = int(cfg["SCRAPE_TIMEOUT_PER_CHANNEL"])
 
-    had_any_update = False
+def _log_run(cfg: dict[str, Any]) -> None:
+    _v(cfg, f"Driver pool: {get_driver_pool(cfg).stats}")
+    _v(cfg, f"Scrape outcomes: {scrape_outcomes}")
+    _v(cfg, f"Single-flight: {singleflight_stats}")
 
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futs = {ex.submit(worker, login): login for login in todo}
-        for fut in as_completed(futs):
-            login = futs[fut]
-            try:
-                got_login, links, err = fut.result(timeout=per_channel_timeout)
-                if err:
-                    _v(cfg, f"{got_login}: {err}")
-                results[got_login] = links
-                cache_set(cfg, got_login, links)
-                had_any_update = True
-            except Exception as e:
-                _v(cfg, f"{login}: future timeout/exception: {e}")
-                results[login] = []
-                cache_set(cfg, login, [])
-                had_any_update = True
-
-    if had_any_update:
-        save_discord_cache(discord_cache)
-        _v(cfg, "discord_cache.json saved")
 
+async def scrape_discord_async(cfg: dict[str, Any], logins: list[str]) -> dict[str, list[str]]:
+    """
+    Discord links per login: cached results first, then the HTTP fast path
+    and the scrape scheduler for the rest. Thousands of calls can be
+    outstanding at the cost of a coroutine each; cache reads and writes
+    (disk, or the shared server) run on worker threads, and browser work on
+    the scheduler's bounded workers. Cancelling the caller leaves scrapes
+    others are attached to running; the run's abort handler calls
+    cancel_pending_scrapes() for the rest.
+    """
+    results, todo = await asyncio.to_thread(_split_cached, cfg, logins)
+    if not todo:
+        return results
+
+    futs, owned = _claim_foreground(todo)
+    await _start_scrapes_async(cfg, owned, futs)
+    # asyncio.wait never cancels what it waits on, so the shared futures survive a cancelled caller.
+    await asyncio.wait([asyncio.wrap_future(f) for f in futs.values()])
+    _collect(cfg, futs, results)
+
+    if owned:
+        _log_run(cfg)
+        await asyncio.to_thread(_save_cache, cfg)
     return results
+
+
+def cancel_pending_scrapes() -> None:
+    # Scrapes that already hold a driver finish (or hit the watchdog) on their own.
+    get_scrape_scheduler().cancel_pending()
@@ -0,0 +1,98 @@
+import time
+from typing import Any
+
+from .helix import TokenSource
+from .state import FOLLOW_INDEX_RECONCILE_SECONDS, load_follow_index, save_follow_index
+from .twitch_aio import iter_pages
+
+FOLLOWED_URL = "https://api.twitch.tv/helix/channels/followed"
+_FIELDS = ("broadcaster_id", "broadcaster_login", "broadcaster_name", "followed_at")
+
+
+def _entry(item: dict[str, Any]) -> dict[str, Any]:
+    return {k: item.get(k) for k in _FIELDS}
+
+
+async def _download(user_token: str | TokenSource, user_id: str, stats: dict[str, Any]) -> list[dict[str, Any]]:
+    follows: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    async for page in iter_pages(user_token, FOLLOWED_URL, {"user_id": user_id, "first": 100}):
+        stats["pages"] += 1
+        for item in page["data"]:
+            # A follow made mid-download shifts the pages by one; skip the repeat.
+            if item.get("broadcaster_id") and item["broadcaster_id"] not in seen:
+                seen.add(item["broadcaster_id"])
+                follows.append(_entry(item))
+    return follows
+
+
+async def sync_followed_channels(
+    user_token: str | TokenSource, user_id: str
+) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+    """
+    The account's follows (newest first, with broadcaster_login/_name), kept
+    in the local follow index. Helix lists follows newest first, so a repeat
+    run only pages until it reaches a follow it already knows: usually one
+    page. A total that no longer adds up (an unfollow) or an index older than
+    FOLLOW_INDEX_RECONCILE_SECONDS triggers a full re-download instead.
+    Requires a user token with scope user:read:follows.
+    """
+    index = load_follow_index()
+    account = index.get(user_id)
+    now = time.time()
+    stats: dict[str, Any] = {"mode": "incremental", "pages": 0, "new": 0}
+
+    previous = account.get("follows") if isinstance(account, dict) else None
+    full = (
+        not isinstance(previous, list)
+        or now - float(account.get("reconciled_at") or 0) >= FOLLOW_INDEX_RECONCILE_SECONDS
+    )
+
+    follows: list[dict[str, Any]] = []
+    if not full:
+        known = {f["broadcaster_id"]: f.get("followed_at") for f in previous if f.get("broadcaster_id")}
+        new: list[dict[str, Any]] = []
+        new_ids: set[str] = set()
+        total = None
+        reached_known = False
+        async for page in iter_pages(user_token, FOLLOWED_URL, {"user_id": user_id, "first": 100}):
+            stats["pages"] += 1
+            total = page.get("total", total)
+            for item in page["data"]:
+                bid = item.get("broadcaster_id")
+                if not bid:
+                    continue
+                if known.get(bid) == item.get("followed_at"):
+                    reached_known = True
+                    break
+                if bid not in new_ids:
+                    new_ids.add(bid)
+                    new.append(_entry(item))
+            if reached_known:
+                break
+
+        if reached_known:
+            # A re-follow moves the channel to the front with a new followed_at.
+            follows = new + [f for f in previous if f.get("broadcaster_id") not in new_ids]
+            if total is not None and total != len(follows):
+                full = True
+        else:
+            # Paged to the end without meeting a known follow: that was a full download.
+            follows = new
+            account["reconciled_at"] = now
+            stats["mode"] = "full"
+        stats["new"] = len(new)
+
+    if full:
+        stats["mode"] = "full"
+        follows = await _download(user_token, user_id, stats)
+        known_ids = {f.get("broadcaster_id") for f in previous or []}
+        stats["new"] = sum(1 for f in follows if f["broadcaster_id"] not in known_ids)
+        account = {"reconciled_at": now}
+
+    account["follows"] = follows
+    account["total"] = len(follows)
+    account["synced_at"] = now
+    index[user_id] = account
+    save_follow_index(index)
+    return follows, stats
@@ -0,0 +1,229 @@
+import asyncio
+import random
+import threading
+from typing import Any, Protocol, runtime_checkable
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .ratelimit import TokenBucket
+from .settings import load_settings
+
+HELIX_BASE_URL = "https://api.twitch.tv/helix"
+OAUTH_TOKEN_URL = "https://id.twitch.tv/oauth2/token"
+OAUTH_DEVICE_URL = "https://id.twitch.tv/oauth2/device"
+OAUTH_VALIDATE_URL = "https://id.twitch.tv/oauth2/validate"
+
+# 429 and 5xx are retried this many times before the HTTPError surfaces.
+MAX_RETRIES = 5
+RETRY_BASE_SECONDS = 0.5
+RETRY_MAX_SECONDS = 30.0
+
+
+@runtime_checkable
+class TokenSource(Protocol):
+    """A token that renews itself (see tokens.TokenManager); a 401 gets one renewal and a retry."""
+
+    def access_token(self) -> str: ...
+
+    def cached(self) -> str | None: ...
+
+    def on_unauthorized(self, token: str) -> None: ...
+
+
+def _bearer(token: Any) -> str:
+    # Accept either {"access_token": "..."} or "..." (TokenSources: AsyncHelixClient._bearer)
+    if isinstance(token, dict):
+        token = token.get("access_token")
+    if not token:
+        raise ValueError("No valid access token provided to twitch_get")
+    return token
+
+
+def _helix_url(url: str) -> str:
+    return url if url.startswith("https://") else f"{HELIX_BASE_URL}/{url.lstrip('/')}"
+
+
+def _retry_delay(status_code: int, attempt: int) -> float:
+    """Jittered pause before retry number `attempt` of a 429 or 5xx."""
+    if status_code == 429:
+        # The bucket already holds every caller until Ratelimit-Reset; the jitter
+        # spreads the retries so they don't all land in the same instant.
+        return random.uniform(0, RETRY_BASE_SECONDS)
+    return backoff_delay(attempt)
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential pause before retry number `attempt` (5xx, dropped connections, timeouts)."""
+    return random.uniform(0, min(RETRY_MAX_SECONDS, RETRY_BASE_SECONDS * 2**attempt))
+
+
+def _json_or_raise(resp: requests.Response) -> dict[str, Any]:
+    if resp.status_code >= 400:
+        try:
+            body = resp.json()
+        except Exception:
+            body = resp.text
+        raise requests.HTTPError(
+            f"{resp.status_code} {resp.reason} for {resp.url} body={body}",
+            response=resp,
+        )
+    return resp.json()
+
+
+class HelixClient:
+    """
+    One keep-alive connection pool for api.twitch.tv and id.twitch.tv.
+    Client-Id is preset on the session from secrets.json and follows the
+    file if it changes; each call only adds its own bearer token. Holds
+    the OAuth calls (oauth_post, validate_token), and the session, retry
+    counters and per-token TokenBuckets (Twitch budgets each token
+    separately) that AsyncHelixClient makes its Helix calls with.
+    """
+
+    def __init__(self, pool_maxsize: int = 16, timeout: float = 20) -> None:
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._client_id: str | None = None
+        self._buckets: dict[str, TokenBucket] = {}
+        self.retries = {"429": 0, "5xx": 0}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize)
+        self.session.mount("https://", adapter)
+
+    def settings(self) -> dict[str, str]:
+        s = load_settings()
+        if s["TWITCH_CLIENT_ID"] != self._client_id:
+            with self._lock:
+                self._client_id = s["TWITCH_CLIENT_ID"]
+                self.session.headers["Client-Id"] = self._client_id
+        return s
+
+    def should_retry(self, status_code: int, attempt: int) -> bool:
+        if (status_code != 429 and status_code < 500) or attempt >= MAX_RETRIES:
+            return False
+        with self._lock:
+            self.retries["429" if status_code == 429 else "5xx"] += 1
+        return True
+
+    def bucket(self, token: str) -> TokenBucket:
+        with self._lock:
+            b = self._buckets.get(token)
+            if b is None:
+                b = self._buckets[token] = TokenBucket()
+            return b
+
+    def budget_stats(self) -> list[dict[str, Any]]:
+        """One dict per token used so far (app token first, typically)."""
+        with self._lock:
+            buckets = list(self._buckets.values())
+        return [b.stats() for b in buckets]
+
+    def oauth_post(self, url: str, data: dict[str, Any]) -> requests.Response:
+        """Form POST to an id.twitch.tv OAuth endpoint; the caller interprets the status."""
+        self.settings()
+        return self.session.post(url, data=data, timeout=self.timeout)
+
+    def validate_token(self, token: str) -> dict[str, Any] | None:
+        """/oauth2/validate: the token's details (client_id, scopes, expires_in, ...) or None if Twitch rejects it."""
+        resp = self.session.get(OAUTH_VALIDATE_URL, headers={"Authorization": f"OAuth {token}"}, timeout=self.timeout)
+        if resp.status_code == 401:
+            return None
+        resp.raise_for_status()
+        return resp.json()
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_client: HelixClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_helix_client() -> HelixClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HelixClient()
+        return _client
+
+
+class AsyncHelixClient:
+    """
+    asyncio front end of HelixClient: each request runs on the sync
+    client's session in a worker thread (asyncio.to_thread), so proxies,
+    CA bundles and connection pooling behave exactly as in requests. It
+    shares the per-token buckets and retry counters, so both draw on one
+    budget; at most `concurrency` requests are in flight.
+    """
+
+    def __init__(self, sync: HelixClient, concurrency: int = 16) -> None:
+        self.sync = sync
+        self.loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def _bearer(self, token: Any) -> str:
+        if isinstance(token, TokenSource):
+            # Renewal is a blocking HTTP call: off the loop, and only when the token isn't usable as is.
+            return token.cached() or await asyncio.to_thread(token.access_token)
+        return _bearer(token)
+
+    async def get(self, token: Any, url: str, params: Any = None) -> dict[str, Any]:
+        self.sync.settings()
+        source = token if isinstance(token, TokenSource) else None
+        bearer = await self._bearer(token)
+        url = _helix_url(url)
+
+        attempt = 0
+        renewed = False
+        while True:
+            bucket = self.sync.bucket(bearer)
+            async with self._slots:
+                await bucket.acquire_async()
+                try:
+                    resp = await asyncio.to_thread(
+                        self.sync.session.get,
+                        url,
+                        headers={"Authorization": f"Bearer {bearer}"},
+                        params=params,
+                        timeout=self.sync.timeout,
+                    )
+                except BaseException:
+                    bucket.update({})
+                    raise
+                bucket.update(resp.headers, throttled=resp.status_code == 429)
+
+            if resp.status_code == 401 and source is not None and not renewed:
+                renewed = True
+                # Waits on the manager's lock, which a renewal (maybe a device-flow prompt) holds: off the loop.
+                await asyncio.to_thread(source.on_unauthorized, bearer)
+                bearer = await self._bearer(source)
+                continue
+            if not self.sync.should_retry(resp.status_code, attempt):
+                return _json_or_raise(resp)
+            attempt += 1
+            await asyncio.sleep(_retry_delay(resp.status_code, attempt))
+
+
+_async_client: AsyncHelixClient | None = None
+
+
+def get_async_helix_client() -> AsyncHelixClient:
+    """The async client for the running event loop."""
+    global _async_client
+    if _async_client is None or _async_client.loop is not asyncio.get_running_loop():
+        _async_client = AsyncHelixClient(get_helix_client())
+    return _async_client
+
+
+def helix_stats_line() -> str:
+    c = get_helix_client()
+    parts = []
+    for st in c.budget_stats():
+        used = st["limit"] - st["available"]
+        parts.append(
+            f"{st['requests']} req, budget {used}/{st['limit']} used, "
+            f"{st['waits']} throttled ({st['wait_seconds']:.1f}s)"
+        )
+    retries = f"retries 429: {c.retries['429']}, 5xx: {c.retries['5xx']}"
+    return "Helix: " + (" | ".join(parts) or "no requests") + " | " + retries
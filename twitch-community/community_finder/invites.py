@@ -0,0 +1,45 @@
+import re
+
+DISCORD_URL_REGEX = re.compile(
+    r"""(?xi)
+    \bhttps?://
+    (?:
+        (?:www\.)?
+        discord\.gg/[A-Za-z0-9-]+
+      |
+        (?:www\.)?
+        discord\.com/invite/[A-Za-z0-9-]+
+      |
+        (?:www\.)?
+        discordapp\.com/invite/[A-Za-z0-9-]+
+    )
+    """
+)
+
+DISCORD_BARE_REGEX = re.compile(
+    r"""(?xi)
+    \b(?:
+        discord\.gg/[A-Za-z0-9-]+
+      |
+        discord\.com/invite/[A-Za-z0-9-]+
+      |
+        discordapp\.com/invite/[A-Za-z0-9-]+
+    )\b
+    """
+)
+
+
+def _normalize_discord_url(u: str) -> str:
+    u = u.strip().strip("\"'")
+    if u.lower().startswith("http://") or u.lower().startswith("https://"):
+        return u
+    return "https://" + u
+
+
+def extract_discord_from_html(html: str) -> list[str]:
+    found: set[str] = set()
+    for m in DISCORD_URL_REGEX.finditer(html or ""):
+        found.add(m.group(0))
+    for m in DISCORD_BARE_REGEX.finditer(html or ""):
+        found.add(_normalize_discord_url(m.group(0)))
+    return sorted(found)
@@ -0,0 +1,67 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import IO, Iterator
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+def _lock_fd(fh: IO[bytes], blocking: bool) -> bool:
+    try:
+        if os.name == "nt":
+            fh.seek(0)
+            mode = msvcrt.LK_LOCK if blocking else msvcrt.LK_NBLCK
+            msvcrt.locking(fh.fileno(), mode, 1)
+        else:
+            flags = fcntl.LOCK_EX if blocking else (fcntl.LOCK_EX | fcntl.LOCK_NB)
+            fcntl.flock(fh.fileno(), flags)
+        return True
+    except OSError:
+        return False
+
+
+def _unlock_fd(fh: IO[bytes]) -> None:
+    try:
+        if os.name == "nt":
+            fh.seek(0)
+            msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    except OSError:
+        pass
+
+
+def try_lock_file(path: str) -> IO[bytes] | None:
+    """
+    Advisory, process-wide exclusive lock on path (created if missing).
+    Returns the open handle on success, None if another process holds it.
+    """
+    fh = open(path, "a+b")
+    if _lock_fd(fh, blocking=False):
+        return fh
+    fh.close()
+    return None
+
+
+def release_lock_file(fh: IO[bytes]) -> None:
+    _unlock_fd(fh)
+    try:
+        fh.close()
+    except OSError:
+        pass
+
+
+@contextmanager
+def locked_file(path: str) -> Iterator[None]:
+    """Blocks until it holds the advisory lock on path, released when the block exits."""
+    fh = open(path, "a+b")
+    try:
+        # msvcrt's blocking mode gives up after ~10s; keep waiting like flock does.
+        while not _lock_fd(fh, blocking=True):
+            time.sleep(0.05)
+        yield
+    finally:
+        release_lock_file(fh)
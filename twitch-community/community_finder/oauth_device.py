@@ -1,45 +1,21 @@
-import json
 import os
 import time
 from typing import Any
 
-import requests
-
+from .helix import OAUTH_DEVICE_URL, OAUTH_TOKEN_URL, get_helix_client
 from .settings import load_settings
 
 PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 USER_TOKEN_PATH = os.path.join(PROJECT_DIR, "user_token.json")
 
-DEVICE_ENDPOINT = "https://id.twitch.tv/oauth2/device"
-TOKEN_ENDPOINT = "https://id.twitch.tv/oauth2/token"
+DEVICE_ENDPOINT = OAUTH_DEVICE_URL
+TOKEN_ENDPOINT = OAUTH_TOKEN_URL
 
 
 class OAuthError(RuntimeError):
     pass
 
 
-def _write_json(path: str, data: dict[str, Any]) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-
-
-def _read_json(path: str) -> dict[str, Any] | None:
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data if isinstance(data, dict) else None
-    except (OSError, json.JSONDecodeError):
-        return None
-
-
-def load_user_token() -> dict[str, Any] | None:
-    return _read_json(USER_TOKEN_PATH)
-
-
-def save_user_token(token_data: dict[str, Any]) -> None:
-    _write_json(USER_TOKEN_PATH, token_data)
-
-
 def device_authorize(scopes: list[str], verbose: bool = False) -> dict[str, Any]:
     """
     Starts Device Code Flow. Returns dict containing:
@@ -53,7 +29,7 @@ def device_authorize(scopes: list[str], verbose: bool = False) -> dict[str, Any]
     if verbose:
         print(f"[VERBOSE] Requesting device code for scopes: {payload['scopes']}")
 
-    r = requests.post(DEVICE_ENDPOINT, data=payload, timeout=20)
+    r = get_helix_client().oauth_post(DEVICE_ENDPOINT, payload)
     r.raise_for_status()
     return r.json()
 
@@ -73,7 +49,7 @@ def device_poll_token(device_code: str, interval: int, verbose: bool = False) ->
             "grant_type": "urn:ietf:params:oauth:grant-type:device_code",
         }
 
-        r = requests.post(TOKEN_ENDPOINT, data=data, timeout=20)
+        r = get_helix_client().oauth_post(TOKEN_ENDPOINT, data)
 
         if r.status_code == 200:
             token = r.json()
@@ -130,36 +106,6 @@ def refresh_user_token(refresh_token: str, verbose: bool = False) -> dict[str, A
     if verbose:
         print("[VERBOSE] Refreshing user token...")
 
-    r = requests.post(TOKEN_ENDPOINT, data=data, timeout=20)
+    r = get_helix_client().oauth_post(TOKEN_ENDPOINT, data)
     r.raise_for_status()
     return r.json()
-
-
-def get_valid_user_access_token(scopes: list[str], verbose: bool = False) -> str:
-    """
-    Returns a valid user access token with required scopes.
-    Stores token in user_token.json.
-    """
-    saved = load_user_token()
-
-    # If we have a refresh token, try refresh first
-    if saved and isinstance(saved.get("refresh_token"), str) and saved["refresh_token"]:
-        try:
-            newtok = refresh_user_token(saved["refresh_token"], verbose=verbose)
-            save_user_token(newtok)
-            return newtok["access_token"]
-        except Exception as e:
-            if verbose:
-                print(f"[VERBOSE] Refresh failed, falling back to device flow: {e}")
-
-    # Start device flow
-    d = device_authorize(scopes, verbose=verbose)
-
-    print("\n=== Twitch Authorization Required ===")
-    print(f"Open: {d.get('verification_uri')}")
-    print(f"Enter code: {d.get('user_code')}")
-    print("Approve access in the browser.\n")
-
-    token = device_poll_token(d["device_code"], int(d.get("interval", 5)), verbose=verbose)
-    save_user_token(token)
-    return token["access_token"]
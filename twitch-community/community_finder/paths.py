@@ -7,4 +7,8 @@ PROJECT_DIR = os.path.dirname(SCRIPT_DIR)
 FILTERS_PATH = os.path.join(PROJECT_DIR, "filters.json")
 CONFIG_PATH = os.path.join(PROJECT_DIR, "config.json")
 DISCORD_CACHE_PATH = os.path.join(PROJECT_DIR, "discord_cache.json")
-
+DISCORD_CACHE_LOCK_PATH = os.path.join(PROJECT_DIR, "discord_cache.json.lock")
+DISCORD_CACHE_DB_PATH = os.path.join(PROJECT_DIR, "discord_cache.db")
+BROWSER_PROFILES_DIR = os.path.join(PROJECT_DIR, "browser_profiles")
+APP_TOKEN_PATH = os.path.join(PROJECT_DIR, "app_token.json")
+FOLLOW_INDEX_PATH = os.path.join(PROJECT_DIR, "follow_index.json")
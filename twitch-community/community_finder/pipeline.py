@@ -0,0 +1,71 @@
+import asyncio
+from collections import deque
+from typing import Any, AsyncIterable, Awaitable, Callable
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+async def run_pipeline(
+    chunks: AsyncIterable[Any],
+    submit: Callable[[Any], Awaitable[Any]],
+    render: Callable[[Any, Any], None],
+    depth: int,
+    source_depth: int | None = None,
+    on_abort: Callable[[], None] | None = None,
+) -> None:
+    """
+    Three stages: chunks are read from the source up to `source_depth`
+    ahead by a producer task, submitted for scraping up to `depth` chunks
+    ahead of the one being rendered, and rendered in order as they finish.
+    Cancelling the caller (Ctrl+C) cancels the producer and every scrape
+    still in flight before on_abort runs.
+    """
+    q: asyncio.Queue = asyncio.Queue(maxsize=max(1, source_depth if source_depth is not None else depth))
+
+    async def produce() -> None:
+        try:
+            async for chunk in chunks:
+                await q.put(chunk)
+        except Exception as e:
+            await q.put(_Failure(e))
+            return
+        await q.put(_DONE)
+
+    producer = asyncio.ensure_future(produce())
+    inflight: deque[tuple[Any, asyncio.Future]] = deque()
+    source_open = True
+
+    try:
+        while True:
+            # Keep the scrape stage fed; only wait on the source when there is nothing to render.
+            while source_open and len(inflight) <= depth:
+                if inflight and q.empty():
+                    break
+                item = await q.get()
+                if item is _DONE:
+                    source_open = False
+                    break
+                if isinstance(item, _Failure):
+                    raise item.error
+                inflight.append((item, asyncio.ensure_future(submit(item))))
+
+            if not inflight:
+                break
+
+            chunk, fut = inflight.popleft()
+            render(chunk, await fut)
+    except BaseException:
+        for _chunk, fut in inflight:
+            fut.cancel()
+        if on_abort is not None:
+            on_abort()
+        raise
+    finally:
+        producer.cancel()
+        await asyncio.gather(producer, *(f for _c, f in inflight), return_exceptions=True)
+
@@ -0,0 +1,117 @@
+import asyncio
+import threading
+import time
+from typing import Any, Mapping
+
+# Twitch's documented default: 800 points per minute per token, refilled continuously.
+DEFAULT_LIMIT = 800
+DEFAULT_WINDOW_SECONDS = 60.0
+
+
+class TokenBucket:
+    """
+    Shared request budget for one Helix token. Starts from Twitch's default
+    limit and is re-synced from the Ratelimit-* headers of every response,
+    so callers run at the server's actual rate rather than a guess.
+    Thread-safe; acquire_async() waits only when the budget is spent.
+    """
+
+    def __init__(self, limit: int = DEFAULT_LIMIT, window: float = DEFAULT_WINDOW_SECONDS) -> None:
+        self._lock = threading.Lock()
+        self.limit = float(limit)
+        self.rate = self.limit / window
+        self.tokens = self.limit
+        self._stamp = time.monotonic()
+        self._blocked_until = 0.0  # monotonic; set by a 429
+        self._inflight = 0
+        # (reset, remaining) of the newest response applied; older ones arriving late are ignored.
+        self._applied: tuple[float, int] | None = None
+
+        self.requests = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.server_remaining: int | None = None
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.limit, self.tokens + (now - self._stamp) * self.rate)
+        self._stamp = now
+
+    def _try_take(self, waited: float) -> float:
+        """Takes a point and returns 0, or returns how long to sleep before asking again."""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now >= self._blocked_until and self.tokens >= 1:
+                self.tokens -= 1
+                self._inflight += 1
+                self.requests += 1
+                if waited:
+                    self.waits += 1
+                    self.wait_seconds += waited
+                return 0.0
+            delay = max(self._blocked_until - now, (1 - self.tokens) / self.rate if self.rate > 0 else 1.0)
+        return min(max(delay, 0.005), 5.0)
+
+    async def acquire_async(self) -> float:
+        """Takes one point, sleeping until one is available. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            delay = self._try_take(waited)
+            if not delay:
+                return waited
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def update(self, headers: Mapping[str, str], throttled: bool = False) -> None:
+        """
+        Called once per acquire_async() with the response headers (empty if the
+        request never got a response). Remaining is what the server saw
+        after this request; points still in flight are taken off it.
+        Concurrent responses can arrive out of order: one older than the
+        last applied (earlier reset, or the same reset with more remaining)
+        is ignored, so a late reply can't re-inflate the budget mid-burst.
+        """
+        with self._lock:
+            self._inflight = max(0, self._inflight - 1)
+            try:
+                limit = int(headers["Ratelimit-Limit"])
+                remaining = int(headers["Ratelimit-Remaining"])
+                reset = float(headers["Ratelimit-Reset"])
+            except (KeyError, ValueError):
+                return
+
+            now = time.monotonic()
+            until_reset = reset - time.time()
+            if throttled:
+                # A 429 is authoritative whatever order it arrives in.
+                self.tokens = 0.0
+                self._stamp = now
+                self._blocked_until = max(self._blocked_until, now + max(until_reset, 0.0))
+
+            last = self._applied
+            if last is not None and (reset < last[0] or (reset == last[0] and remaining > last[1])):
+                return
+            self._applied = (reset, remaining)
+
+            self.limit = float(max(1, limit))
+            self.server_remaining = remaining
+            # Reset is when the bucket is full again: that gives the refill rate.
+            if remaining < limit and until_reset > 0:
+                self.rate = (limit - remaining) / until_reset
+            if not throttled:
+                self.tokens = float(max(0, remaining - self._inflight))
+                self._stamp = now
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                "limit": int(self.limit),
+                "available": int(self.tokens),
+                "server_remaining": self.server_remaining,
+                "refill_per_s": round(self.rate, 2),
+                "inflight": self._inflight,
+                "requests": self.requests,
+                "waits": self.waits,
+                "wait_seconds": round(self.wait_seconds, 2),
+            }
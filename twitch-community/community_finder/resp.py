@@ -0,0 +1,123 @@
+import socket
+import ssl
+import threading
+from typing import Any
+from urllib.parse import unquote, urlsplit
+
+# Minimal client for the Redis serialization protocol (RESP2), enough for a
+# shared key-value cache: works against Redis, Valkey, KeyDB, Dragonfly, ...
+
+
+class RespError(Exception):
+    """An error reply from the server (the connection itself is fine)."""
+
+
+def _encode(args: tuple[Any, ...]) -> bytes:
+    out = [b"*%d\r\n" % len(args)]
+    for a in args:
+        if isinstance(a, bytes):
+            b = a
+        elif isinstance(a, str):
+            b = a.encode("utf-8")
+        else:
+            b = str(a).encode("ascii")
+        out.append(b"$%d\r\n%s\r\n" % (len(b), b))
+    return b"".join(out)
+
+
+class RespClient:
+    """
+    One lazily (re)connected socket, used by one command or pipeline at a time.
+    URL: redis://[[user]:password@]host[:port][/db], rediss:// for TLS.
+    Socket failures raise OSError and drop the connection; the next call reconnects.
+    """
+
+    def __init__(self, url: str, timeout: float = 2.0) -> None:
+        u = urlsplit(url)
+        if u.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported cache URL scheme: {u.scheme!r}")
+        self.host = u.hostname or "127.0.0.1"
+        self.port = u.port or 6379
+        self.tls = u.scheme == "rediss"
+        self.username = unquote(u.username) if u.username else None
+        self.password = unquote(u.password) if u.password else None
+        path = u.path.strip("/")
+        self.db = int(path) if path.isdigit() else 0
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._rfile: Any = None
+
+    def _connect(self) -> None:
+        sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        if self.tls:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=self.host)
+        self._sock = sock
+        self._rfile = sock.makefile("rb")
+
+        setup: list[tuple[Any, ...]] = []
+        if self.password is not None:
+            setup.append(("AUTH", self.username, self.password) if self.username else ("AUTH", self.password))
+        if self.db:
+            setup.append(("SELECT", self.db))
+        for reply in self._roundtrip(setup):
+            if isinstance(reply, RespError):
+                self._disconnect()
+                raise reply
+
+    def _disconnect(self) -> None:
+        for c in (self._rfile, self._sock):
+            try:
+                if c is not None:
+                    c.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._rfile = None
+
+    def _read_reply(self) -> Any:
+        line = self._rfile.readline()
+        if not line.endswith(b"\r\n"):
+            raise ConnectionError("Connection closed by cache server")
+        kind, body = line[:1], line[1:-2]
+        if kind == b"+":
+            return body.decode("utf-8", "replace")
+        if kind == b"-":
+            return RespError(body.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(body)
+        if kind == b"$":
+            n = int(body)
+            if n < 0:
+                return None
+            data = self._rfile.read(n + 2)
+            if len(data) != n + 2:
+                raise ConnectionError("Connection closed by cache server")
+            return data[:-2]
+        if kind == b"*":
+            n = int(body)
+            return None if n < 0 else [self._read_reply() for _ in range(n)]
+        raise ConnectionError(f"Unexpected reply from cache server: {line[:40]!r}")
+
+    def _roundtrip(self, commands: list[tuple[Any, ...]]) -> list[Any]:
+        if not commands:
+            return []
+        assert self._sock is not None
+        self._sock.sendall(b"".join(_encode(c) for c in commands))
+        return [self._read_reply() for _ in commands]
+
+    def pipeline(self, commands: list[tuple[Any, ...]]) -> list[Any]:
+        """Sends all commands in one write; error replies come back as RespError values."""
+        with self._lock:
+            try:
+                if self._sock is None:
+                    self._connect()
+                return self._roundtrip(commands)
+            except (OSError, ValueError):
+                self._disconnect()
+                raise
+
+    def close(self) -> None:
+        with self._lock:
+            self._disconnect()
@@ -1,23 +1,34 @@
-from typing import Any
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterable, Callable, Coroutine
 
 from .state import load_filters, load_config
 from .ui import main_menu, clear_screen, show_filters_line, show_config_line
 from .formatters import bold, gray, dim, yellow, print_page_header, print_results_table
-from .twitch_api import (
-    get_app_token,
+from .twitch_api import GAME_NAME, LANGUAGE
+from .twitch_aio import (
     get_game_id,
-    get_streams_page,
+    StreamsPaginator,
     get_users_by_login,
+    get_users_by_ids,
     get_streams_by_user_ids,
-    GAME_NAME,
-    LANGUAGE,
 )
-from .discord import scrape_discord_for_logins_parallel
-
-from.oauth_device import get_valid_user_access_token
-from .twitch_api import get_followed_channels, get_users_by_ids
+from .follows import sync_followed_channels
+from .discord import (
+    scrape_discord_async,
+    cancel_pending_scrapes,
+    cache_stats_line,
+)
+from .pipeline import run_pipeline
+from .browser import shutdown_driver_pool, reset_network_stats, network_stats_line
+from .helix import helix_stats_line
+from .helix import TokenSource
+from .tokens import get_app_tokens, get_user_tokens
 
 OUTPUT_BATCH_SIZE = 10
+# Worker threads behind asyncio.to_thread: Helix and GQL requests, cache reads/writes.
+IO_THREADS = 32
 
 
 def passes_viewer_filters(viewers: int, f: dict[str, Any]) -> bool:
@@ -34,13 +45,38 @@ def sort_streams(streams: list[dict[str, Any]], sort_order: str) -> list[dict[st
     return sorted(streams, key=lambda s: int(s.get("viewer_count", 0)), reverse=rev)
 
 
+def _live_stream_row(s: dict[str, Any], discord_map: dict[str, list[str]]) -> dict[str, Any]:
+    return {
+        "name": s["user_name"],
+        "status": "LIVE",
+        "viewers": int(s["viewer_count"]),
+        "discords": discord_map.get(s["user_login"], []),
+    }
+
+
 class App:
-    def __init__(self) -> None:
+    def __init__(self, warm_token: bool = True) -> None:
         self.filters = load_filters()
         self.cfg = load_config()
-        self.token = get_app_token()
+        # Loaded (or renewed if due) while the user is still in the menu; a failure here is retried on first use.
+        self.tokens = get_app_tokens()
+        if warm_token:
+            threading.Thread(target=self._warm_token, name="app-token", daemon=True).start()
+
+    def _warm_token(self) -> None:
+        try:
+            self.tokens.access_token()
+        except Exception:
+            pass
 
     def run(self) -> None:
+        try:
+            self._menu_loop()
+        finally:
+            cancel_pending_scrapes()
+            shutdown_driver_pool()
+
+    def _menu_loop(self) -> None:
         while True:
             plan = main_menu(self.filters, self.cfg)
             if plan is None:
@@ -57,6 +93,8 @@ class App:
             sort_order = plan["sort"]
             f = plan["filters"]
 
+            reset_network_stats()
+
             if mode == "infinite":
                 self.run_infinite(sort_order, f)
             elif mode == "count":
@@ -66,93 +104,128 @@ class App:
             elif mode == "followed":
                 self.run_followed(plan["username"], sort_order, f)
 
+            print()
+            print(gray(cache_stats_line()))
+            print(gray(helix_stats_line()))
+            if self.cfg.get("NETWORK_BLOCKING", False):
+                print(gray(network_stats_line()))
+
             print()
             input(dim("Press Enter to return to the menu..."))
 
-    def run_infinite(self, sort_order: str, f: dict[str, Any]) -> None:
-        game_id = get_game_id(self.token, GAME_NAME)
-        after: str | None = None
+    def _run_async(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """
+        Each run mode is a coroutine on its own event loop. Ctrl+C cancels
+        it (and everything it awaits) and then raises KeyboardInterrupt here.
+        """
+        async def main() -> Any:
+            # Blocking I/O runs on these threads; asyncio.run shuts them down afterwards.
+            asyncio.get_running_loop().set_default_executor(
+                ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="io")
+            )
+            return await coro
+
+        return asyncio.run(main())
+
+    async def _render_pipeline(
+        self,
+        chunks: AsyncIterable[list[dict[str, Any]]],
+        login_of: Callable[[dict[str, Any]], str | None],
+        row_of: Callable[[dict[str, Any], dict[str, list[str]]], dict[str, Any]],
+    ) -> None:
+        """
+        Helix/chunk production, Discord scraping and table printing overlap:
+        scrapes for the next PIPELINE_PREFETCH_PAGES pages run while the
+        current page waits/prints.
+        """
         page_num = 1
 
+        def submit(chunk: list[dict[str, Any]]) -> Coroutine[Any, Any, dict[str, list[str]]]:
+            logins = [login_of(x) for x in chunk if login_of(x)]
+            return scrape_discord_async(self.cfg, logins)
+
+        def render(chunk: list[dict[str, Any]], discord_map: dict[str, list[str]]) -> None:
+            nonlocal page_num
+            print_page_header(page_num)
+            print_results_table([row_of(x, discord_map) for x in chunk])
+            page_num += 1
+
+        await run_pipeline(
+            chunks,
+            submit,
+            render,
+            depth=int(self.cfg["PIPELINE_PREFETCH_PAGES"]),
+            on_abort=cancel_pending_scrapes,
+        )
+
+    def run_infinite(self, sort_order: str, f: dict[str, Any]) -> None:
         print(bold("Infinite discovery started."))
         print(gray("Press Ctrl+C to stop.\n"))
 
         try:
-            while True:
-                page = get_streams_page(
-                    self.token,
-                    game_id,
-                    LANGUAGE,
-                    int(self.cfg["STREAMS_PAGE_SIZE"]),
-                    after
-                )
-                data = page.get("data", [])
-                if not data:
-                    print(gray("No more streams returned. Stopping."))
-                    break
+            self._run_async(self._infinite(self.tokens, sort_order, f))
+        except KeyboardInterrupt:
+            print("\n" + yellow("Stopped by user (Ctrl+C)."))
+
+    def run_count(self, n: int, sort_order: str, f: dict[str, Any]) -> None:
+        self._run_async(self._count(self.tokens, n, sort_order, f))
+
+    def run_names(self, names: list[str], sort_order: str, f: dict[str, Any]) -> None:
+        self._run_async(self._names(self.tokens, names, sort_order, f))
 
+    def run_followed(self, typed_username: str, sort_order: str, f: dict[str, Any]) -> None:
+        verbose = bool(self.cfg.get("VERBOSE", False))
+        user_tokens = get_user_tokens(["user:read:follows"], verbose=verbose)
+        # Device flow may prompt and poll for minutes: kept off the event loop so Ctrl+C stays immediate.
+        user_tokens.access_token()
+        self._run_async(self._followed(self.tokens, user_tokens, typed_username, sort_order, f))
+
+    def _v(self, msg: str) -> None:
+        if self.cfg.get("VERBOSE", False):
+            print(f"[VERBOSE] {msg}")
+
+    def _streams(self, token: TokenSource, game_id: str) -> StreamsPaginator:
+        return StreamsPaginator(
+            token,
+            game_id,
+            LANGUAGE,
+            int(self.cfg["STREAMS_PAGE_SIZE"]),
+            prefetch=int(self.cfg["STREAMS_PREFETCH_PAGES"]),
+        )
+
+    async def _infinite(self, token: TokenSource, sort_order: str, f: dict[str, Any]) -> None:
+        game_id = await get_game_id(token, GAME_NAME)
+        stop_msg: list[str] = []
+
+        async def chunks(pager: StreamsPaginator):
+            async for page in pager.pages():
+                data = page["data"]
                 filtered = [s for s in data if passes_viewer_filters(int(s["viewer_count"]), f)]
                 filtered = sort_streams(filtered, sort_order)
 
-                idx = 0
-                while idx < len(filtered):
-                    chunk = filtered[idx: idx + OUTPUT_BATCH_SIZE]
-                    idx += OUTPUT_BATCH_SIZE
-
-                    logins = [s["user_login"] for s in chunk]
-                    discord_map = scrape_discord_for_logins_parallel(self.cfg, logins)
-
-                    rows: list[dict[str, Any]] = []
-                    for s in chunk:
-                        rows.append({
-                            "name": s["user_name"],
-                            "status": "LIVE",
-                            "viewers": int(s["viewer_count"]),
-                            "discords": discord_map.get(s["user_login"], []),
-                        })
-
-                    print_page_header(page_num)
-                    print_results_table(rows)
-                    page_num += 1
-
-                pagination = page.get("pagination", {}) or {}
-                after = pagination.get("cursor")
-                if not after:
-                    print(gray("Reached end of pagination. Stopping."))
-                    break
+                for idx in range(0, len(filtered), OUTPUT_BATCH_SIZE):
+                    yield filtered[idx: idx + OUTPUT_BATCH_SIZE]
+            stop_msg.append("Reached end of pagination. Stopping.")
 
-        except KeyboardInterrupt:
-            print("\n" + yellow("Stopped by user (Ctrl+C)."))
+        async with self._streams(token, game_id) as pager:
+            try:
+                await self._render_pipeline(chunks(pager), lambda s: s["user_login"], _live_stream_row)
+            finally:
+                self._v(pager.stats_line())
+        for msg in stop_msg:
+            print(gray(msg))
 
-    def run_count(self, n: int, sort_order: str, f: dict[str, Any]) -> None:
-        game_id = get_game_id(self.token, GAME_NAME)
+    async def _count(self, token: TokenSource, n: int, sort_order: str, f: dict[str, Any]) -> None:
+        game_id = await get_game_id(token, GAME_NAME)
 
         collected: list[dict[str, Any]] = []
-        after: str | None = None
-
-        while len(collected) < n:
-            page = get_streams_page(
-                self.token,
-                game_id,
-                LANGUAGE,
-                int(self.cfg["STREAMS_PAGE_SIZE"]),
-                after
-            )
-
-            data = page.get("data", [])
-            if not data:
-                break
-
-            for s in data:
+        async with self._streams(token, game_id) as pager:
+            async for s in pager:
                 if passes_viewer_filters(int(s["viewer_count"]), f):
                     collected.append(s)
                     if len(collected) >= n:
                         break
-
-            pagination = page.get("pagination", {}) or {}
-            after = pagination.get("cursor")
-            if not after:
-                break
+            self._v(pager.stats_line())
 
         if not collected:
             print(gray("No matching streams found."))
@@ -161,33 +234,17 @@ class App:
         collected = sort_streams(collected, sort_order)
         result = collected[:n]
 
-        page_num = 1
-        idx = 0
-        while idx < len(result):
-            chunk = result[idx: idx + OUTPUT_BATCH_SIZE]
-            idx += OUTPUT_BATCH_SIZE
+        async def chunks():
+            for idx in range(0, len(result), OUTPUT_BATCH_SIZE):
+                yield result[idx: idx + OUTPUT_BATCH_SIZE]
 
-            logins = [s["user_login"] for s in chunk]
-            discord_map = scrape_discord_for_logins_parallel(self.cfg, logins)
-
-            rows: list[dict[str, Any]] = []
-            for s in chunk:
-                rows.append({
-                    "name": s["user_name"],
-                    "status": "LIVE",
-                    "viewers": int(s["viewer_count"]),
-                    "discords": discord_map.get(s["user_login"], []),
-                })
-
-            print_page_header(page_num)
-            print_results_table(rows)
-            page_num += 1
+        await self._render_pipeline(chunks(), lambda s: s["user_login"], _live_stream_row)
 
         if len(result) < n:
             print(yellow(f"Only {len(result)} matched your filters (requested {n})."))
 
-    def run_names(self, names: list[str], sort_order: str, f: dict[str, Any]) -> None:
-        users = get_users_by_login(self.token, names)
+    async def _names(self, token: TokenSource, names: list[str], sort_order: str, f: dict[str, Any]) -> None:
+        users = await get_users_by_login(token, names)
         login_to_user = {u["login"].lower(): u for u in users}
 
         missing = [n for n in names if n.lower() not in login_to_user]
@@ -200,7 +257,7 @@ class App:
             return
 
         user_ids = [u["id"] for u in users]
-        live_streams = get_streams_by_user_ids(self.token, user_ids)
+        live_streams = await get_streams_by_user_ids(token, user_ids)
         live_by_user_id = {s["user_id"]: s for s in live_streams}
 
         ordered_users: list[dict[str, Any]] = []
@@ -233,7 +290,7 @@ class App:
         live_logins = [s["user_login"] for s in live_list]
         offline_logins = [u["login"] for u in offline_list]
         all_logins = list(dict.fromkeys(live_logins + offline_logins))
-        discord_map = scrape_discord_for_logins_parallel(self.cfg, all_logins)
+        discord_map = await scrape_discord_async(self.cfg, all_logins)
 
         if live_list:
             print(bold("=== LIVE ===\n"))
@@ -263,15 +320,15 @@ class App:
 
         if not live_list and not offline_list:
             print(gray("No results."))
-    
-    def run_followed(self, typed_username: str, sort_order: str, f: dict[str, Any]) -> None:
-        verbose = bool(self.cfg.get("VERBOSE", False))
 
-        # 1) user token (device flow) with required scope
-        user_token = get_valid_user_access_token(["user:read:follows"], verbose=verbose)
+    async def _followed(
+        self, token: TokenSource, user_token: TokenSource, typed_username: str, sort_order: str, f: dict[str, Any]
+    ) -> None:
+        verbose = bool(self.cfg.get("VERBOSE", False))
+        # 1) user token (device flow) with required scope: obtained by run_followed
 
         # 2) resolve typed username -> user_id
-        users = get_users_by_login(self.token, [typed_username])
+        users = await get_users_by_login(token, [typed_username])
         if not users:
             print(gray("User not found."))
             return
@@ -281,21 +338,31 @@ class App:
         if verbose:
             print(f"[VERBOSE] Fetching followed channels for {typed_username} (id={target_id})")
 
-        # 3) list followed channels (pagination)
-        followed = get_followed_channels(user_token, target_id, first=100)
+        # 3) followed channels, from the local follow index topped up from Helix
+        followed, sync = await sync_followed_channels(user_token, target_id)
+        if verbose:
+            print(f"[VERBOSE] Follow index: {sync['mode']} sync, {sync['pages']} page(s), "
+                  f"{sync['new']} new, {len(followed)} total")
         if not followed:
             print(gray("No followed channels returned (or not authorized)."))
             return
 
-        # followed items include broadcaster_id and broadcaster_name
-        broadcaster_ids = [x["broadcaster_id"] for x in followed if x.get("broadcaster_id")]
+        # followed items carry broadcaster_login/_name; only entries without one are looked up
+        broadcaster_ids = [x["broadcaster_id"] for x in followed]
+        unnamed = [x["broadcaster_id"] for x in followed if not x.get("broadcaster_login")]
         # 4) live status + viewers
-        live_streams = get_streams_by_user_ids(self.token, broadcaster_ids)
+        live_streams, users2 = await asyncio.gather(
+            get_streams_by_user_ids(token, broadcaster_ids),
+            get_users_by_ids(token, unnamed),
+        )
         live_by_id = {s["user_id"]: s for s in live_streams}
 
-        # 5) fetch user logins/display for offline too
-        users2 = get_users_by_ids(self.token, broadcaster_ids)
-        id_to_user = {u["id"]: u for u in users2}
+        # 5) logins/display names for offline channels too
+        id_to_user = {
+            x["broadcaster_id"]: {"login": x.get("broadcaster_login"), "display_name": x.get("broadcaster_name")}
+            for x in followed
+        }
+        id_to_user.update({u["id"]: u for u in users2})
 
         # build rows
         rows: list[dict[str, Any]] = []
@@ -321,25 +388,16 @@ class App:
             rows.sort(key=lambda r: (r["viewers"] is None, -(r["viewers"] or 0)))
 
         # 6) discord scrape (cached) and print pages
-        page_num = 1
-        idx = 0
-        while idx < len(rows):
-            chunk = rows[idx: idx + OUTPUT_BATCH_SIZE]
-            idx += OUTPUT_BATCH_SIZE
-
-            logins = [r["login"] for r in chunk if r.get("login")]
-            discord_map = scrape_discord_for_logins_parallel(self.cfg, logins)
-
-            out_rows: list[dict[str, Any]] = []
-            for r in chunk:
-                out_rows.append({
-                    "name": r["name"],
-                    "status": r["status"],
-                    "viewers": r["viewers"],
-                    "discords": discord_map.get(r["login"], []),
-                })
-
-            print_page_header(page_num)
-            print_results_table(out_rows)
-            page_num += 1
-
+        async def chunks():
+            for idx in range(0, len(rows), OUTPUT_BATCH_SIZE):
+                yield rows[idx: idx + OUTPUT_BATCH_SIZE]
+
+        def row_of(r: dict[str, Any], discord_map: dict[str, list[str]]) -> dict[str, Any]:
+            return {
+                "name": r["name"],
+                "status": r["status"],
+                "viewers": r["viewers"],
+                "discords": discord_map.get(r["login"], []),
+            }
+
+        await self._render_pipeline(chunks(), lambda r: r.get("login"), row_of)
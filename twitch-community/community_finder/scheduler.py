@@ -0,0 +1,190 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Callable
+
+
+class ScrapeTask:
+    def __init__(self, login: str, cfg: dict[str, Any], background: bool = False) -> None:
+        self.login = login
+        self.cfg = cfg
+        self.background = background
+        self.future: Future = Future()
+        # When the deadline started (begin()); None while waiting for a driver.
+        self.started: float | None = None
+        # Set by the runner while it holds a driver, so the watchdog can kill it.
+        self.lease: Any = None
+        self.abandoned = False
+        self.finished = False
+        # Orders begin()/end() against the watchdog abandoning the task and reading the lease.
+        self.lock = threading.Lock()
+
+    @property
+    def timeout(self) -> float:
+        return float(self.cfg["SCRAPE_TIMEOUT_PER_CHANNEL"])
+
+    def begin(self, lease: Any) -> bool:
+        """
+        Publishes what the task now holds and starts its deadline. False if
+        the watchdog already gave up on it: the caller must not go on.
+        """
+        with self.lock:
+            if self.abandoned:
+                return False
+            self.lease = lease
+            self.started = time.time()
+            return True
+
+    def end(self) -> None:
+        with self.lock:
+            self.lease = None
+
+    def held(self) -> Any:
+        """The lease to kill, for on_timeout()."""
+        with self.lock:
+            return self.lease
+
+
+class ScrapeScheduler:
+    """
+    Runs one scrape per worker thread, at most `workers` at a time.
+
+    A dispatcher thread doubles as the watchdog: once a task is more than
+    SCRAPE_TIMEOUT_PER_CHANNEL past task.begin() (which run() calls after
+    acquiring its driver) it is abandoned, on_timeout() kills whatever it
+    was blocked on, its future is resolved with on_timeout()'s value, and
+    the slot goes to the next task right away. A stuck thread that later
+    wakes up is ignored.
+
+    Background tasks (cache revalidation) only get a slot while no
+    foreground task is waiting.
+
+    run(task) -> value, on_timeout(task) -> value, on_result(task, value)
+    is called once per task before its future resolves.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[ScrapeTask], Any],
+        on_timeout: Callable[[ScrapeTask], Any],
+        on_result: Callable[[ScrapeTask, Any], None] | None = None,
+        tick_seconds: float = 0.2,
+    ) -> None:
+        self._run = run
+        self._on_timeout = on_timeout
+        self._on_result = on_result
+        self._tick = tick_seconds
+
+        self._cond = threading.Condition()
+        self._pending: deque[ScrapeTask] = deque()
+        self._background: deque[ScrapeTask] = deque()
+        self._active: set[ScrapeTask] = set()
+        self._thread: threading.Thread | None = None
+        self.workers = 1
+
+        self.stats = {"submitted": 0, "completed": 0, "timed_out": 0, "background": 0}
+
+    def submit(self, cfg: dict[str, Any], login: str, background: bool = False) -> Future:
+        task = ScrapeTask(login, cfg, background)
+        with self._cond:
+            self.workers = max(1, int(cfg["SCRAPE_WORKERS"]))
+            (self._background if background else self._pending).append(task)
+            self.stats["submitted"] += 1
+            if background:
+                self.stats["background"] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._loop, name="scrape-dispatcher", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+        return task.future
+
+    def cancel_pending(self) -> int:
+        with self._cond:
+            pending = list(self._pending) + list(self._background)
+            self._pending.clear()
+            self._background.clear()
+        n = 0
+        for t in pending:
+            if t.future.cancel():
+                n += 1
+        return n
+
+    def promote(self, login: str) -> bool:
+        """Moves a queued background task for login to the foreground queue."""
+        with self._cond:
+            for t in self._background:
+                if t.login.lower() == login.lower():
+                    self._background.remove(t)
+                    t.background = False
+                    self._pending.append(t)
+                    self._cond.notify_all()
+                    return True
+        return False
+
+    def _finish(self, task: ScrapeTask, value: Any, error: BaseException | None = None) -> None:
+        with self._cond:
+            if task.finished:
+                return
+            task.finished = True
+
+        if error is None and self._on_result is not None:
+            try:
+                self._on_result(task, value)
+            except Exception as e:
+                error = e
+
+        try:
+            if error is not None:
+                task.future.set_exception(error)
+            else:
+                task.future.set_result(value)
+        except InvalidStateError:
+            # cancelled by the caller meanwhile
+            pass
+
+    def _loop(self) -> None:
+        while True:
+            expired: list[ScrapeTask] = []
+
+            with self._cond:
+                now = time.time()
+                for t in list(self._active):
+                    if t.started is not None and (now - t.started) > t.timeout:
+                        with t.lock:
+                            t.abandoned = True
+                        self._active.discard(t)
+                        expired.append(t)
+
+                while (self._pending or self._background) and len(self._active) < self.workers:
+                    t = (self._pending or self._background).popleft()
+                    if t.future.cancelled():
+                        continue
+                    self._active.add(t)
+                    threading.Thread(target=self._work, args=(t,), name=f"scrape-{t.login}", daemon=True).start()
+
+                if not expired:
+                    self._cond.wait(self._tick)
+
+            for t in expired:
+                self.stats["timed_out"] += 1
+                try:
+                    value = self._on_timeout(t)
+                except Exception as e:
+                    self._finish(t, None, e)
+                    continue
+                self._finish(t, value)
+
+    def _work(self, task: ScrapeTask) -> None:
+        try:
+            value = self._run(task)
+        except BaseException as e:
+            self._finish(task, None, e)
+        else:
+            self._finish(task, value)
+        finally:
+            with self._cond:
+                if task in self._active:
+                    self._active.discard(task)
+                    self.stats["completed"] += 1
+                self._cond.notify_all()
@@ -1,5 +1,6 @@
 import json
 import os
+import threading
 from typing import Any
 
 # secrets.json lives in the project root (same folder as main.py)
@@ -26,7 +27,34 @@ def _read_json(path: str) -> dict[str, Any]:
         raise SettingsError(f"Failed to read secrets.json: {e}")
 
 
+_cache_lock = threading.Lock()
+_cached: tuple[tuple[int, int], dict[str, str]] | None = None
+
+
 def load_settings() -> dict[str, str]:
+    """
+    Parsed once and reused until secrets.json changes on disk (mtime/size),
+    so hot paths can call this freely. Returns a copy.
+    """
+    global _cached
+    try:
+        st = os.stat(SECRETS_PATH)
+        stamp = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        stamp = None
+
+    with _cache_lock:
+        if stamp is not None and _cached is not None and _cached[0] == stamp:
+            return dict(_cached[1])
+
+    settings = _parse_settings()
+    if stamp is not None:
+        with _cache_lock:
+            _cached = (stamp, settings)
+    return dict(settings)
+
+
+def _parse_settings() -> dict[str, str]:
     data = _read_json(SECRETS_PATH)
 
     def req(key: str) -> str:
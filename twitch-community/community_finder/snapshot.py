@@ -0,0 +1,145 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+import zlib
+from typing import Any, Iterator
+
+from .cache_store import LOCAL_FIELDS, CacheStore
+
+# Snapshot file: gzip'd JSON lines. The first line is a header, then one
+# {"login": ..., "entry": {...}} per line, so both ends can stream.
+SNAPSHOT_FORMAT = "community-finder-discord-cache"
+SNAPSHOT_VERSION = 1
+
+_IMPORT_BATCH = 500
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def parse_age(text: str) -> float:
+    """'90' (seconds), '30m', '12h', '7d' -> seconds."""
+    text = text.strip().lower()
+    units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+    try:
+        if text and text[-1] in units:
+            return float(text[:-1]) * units[text[-1]]
+        return float(text)
+    except ValueError:
+        raise SnapshotError(f"Invalid age: {text!r} (use e.g. 3600, 30m, 12h, 7d)") from None
+
+
+def _newer_than(entry: dict[str, Any], cutoff: float | None) -> bool:
+    ts = entry.get("ts")
+    return isinstance(ts, (int, float)) and (cutoff is None or ts >= cutoff)
+
+
+def export_snapshot(store: CacheStore, path: str, max_age: float | None = None) -> int:
+    """Writes every entry (scraped within max_age seconds, if given) to path; returns how many."""
+    cutoff = time.time() - max_age if max_age is not None else None
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=directory)
+    n = 0
+    try:
+        with os.fdopen(fd, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=5) as gz:
+            header = {"format": SNAPSHOT_FORMAT, "version": SNAPSHOT_VERSION, "created": time.time()}
+            gz.write(json.dumps(header).encode("utf-8") + b"\n")
+            for login, entry in store.items():
+                if not _newer_than(entry, cutoff):
+                    continue
+                portable = {k: v for k, v in entry.items() if k not in LOCAL_FIELDS}
+                gz.write(json.dumps({"login": login, "entry": portable}, separators=(",", ":")).encode("utf-8"))
+                gz.write(b"\n")
+                n += 1
+        # Renamed into place only when complete: a scheduled export never leaves half a file.
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    return n
+
+
+def read_snapshot(path: str) -> Iterator[tuple[str, dict[str, Any]]]:
+    """
+    Streams (login, entry) pairs; raises SnapshotError on a foreign, newer
+    or damaged (e.g. truncated) file. Malformed records are skipped.
+    """
+    try:
+        yield from _read_records(path)
+    except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+        raise SnapshotError(f"{path}: damaged snapshot ({e or 'truncated'})") from None
+
+
+def _read_records(path: str) -> Iterator[tuple[str, dict[str, Any]]]:
+    with gzip.open(path, "rb") as gz:
+        try:
+            header = json.loads(gz.readline())
+        except (ValueError, OSError, EOFError):
+            raise SnapshotError(f"{path}: not a cache snapshot") from None
+        if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+            raise SnapshotError(f"{path}: not a cache snapshot")
+        if int(header.get("version", 0)) > SNAPSHOT_VERSION:
+            raise SnapshotError(f"{path}: snapshot version {header.get('version')} is newer than this program")
+
+        for line in gz:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(rec, dict):
+                continue
+            login, entry = rec.get("login"), rec.get("entry")
+            if isinstance(login, str) and isinstance(entry, dict):
+                yield login.lower(), entry
+
+
+def _ts(entry: Any) -> float:
+    ts = entry.get("ts") if isinstance(entry, dict) else None
+    return float(ts) if isinstance(ts, (int, float)) else -1.0
+
+
+def import_snapshots(store: CacheStore, paths: list[str], max_age: float | None = None) -> dict[str, int]:
+    """
+    Merges snapshots into the store, newest "ts" winning per login (across
+    the files and against what the store already has). Records are compared
+    against the store _IMPORT_BATCH at a time, with one get_many() each.
+    A damaged file raises SnapshotError; batches already merged stay merged
+    (importing again is harmless).
+    """
+    cutoff = time.time() - max_age if max_age is not None else None
+    stats = {"read": 0, "imported": 0, "skipped": 0}
+    batch: dict[str, dict[str, Any]] = {}
+
+    def merge() -> None:
+        have = store.get_many(list(batch), touch=False)
+        newer = {k: v for k, v in batch.items() if _ts(v) > _ts(have.get(k))}
+        if newer:
+            store.put_many(newer)
+        stats["imported"] += len(newer)
+        stats["skipped"] += len(batch) - len(newer)
+        batch.clear()
+
+    try:
+        for path in paths:
+            for login, entry in read_snapshot(path):
+                stats["read"] += 1
+                if not _newer_than(entry, cutoff) or _ts(entry) <= _ts(batch.get(login)):
+                    stats["skipped"] += 1
+                    continue
+                if login in batch:
+                    stats["skipped"] += 1  # the older copy it replaces
+                batch[login] = entry
+                if len(batch) >= _IMPORT_BATCH:
+                    merge()
+
+        if batch:
+            merge()
+    finally:
+        store.flush()
+    return stats
@@ -1,7 +1,46 @@
 import json
+import os
+import tempfile
+import time
 from typing import Any
 
-from .paths import FILTERS_PATH, CONFIG_PATH, DISCORD_CACHE_PATH
+from .paths import FILTERS_PATH, CONFIG_PATH, DISCORD_CACHE_PATH, FOLLOW_INDEX_PATH
+
+# Things an About page pulls in that have nothing to do with rendering panels.
+DEFAULT_BLOCKED_URL_PATTERNS = [
+    # video player / HLS
+    "*usher.ttvnw.net*",
+    "*.hls.ttvnw.net*",
+    "*video-weaver*",
+    "*video-edge*",
+    "*player-core*",
+    "*wasmworker*",
+    # thumbnails / previews CDN
+    "*static-cdn.jtvnw.net/previews-ttv*",
+    "*static-cdn.jtvnw.net/cf_vods*",
+    "*static-cdn.jtvnw.net/ttv-boxart*",
+    # analytics / ads
+    "*spade.twitch.tv*",
+    "*countess.twitch.tv*",
+    "*edge.ads.twitch.tv*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*amazon-adsystem.com*",
+    "*imasdk.googleapis.com*",
+    "*scorecardresearch.com*",
+]
+
+DEFAULT_BLOCKED_RESOURCE_TYPES = ["media", "font", "websocket"]
+
+# Network.setBlockedURLs only understands URL patterns, so resource types map to patterns.
+RESOURCE_TYPE_PATTERNS: dict[str, list[str]] = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*"],
+    "font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.m3u8*", "*.mp4*", "*.webm*", "*.mp3*", "*.aac*", "*.ts"],
+    "stylesheet": ["*.css*"],
+    "websocket": ["ws://*", "wss://*"],
+}
 
 DEFAULT_FILTERS = {"min_viewers": 0, "max_viewers": None}
 
@@ -9,20 +48,119 @@ DEFAULT_CONFIG = {
     "PAGE_LOAD_TIMEOUT_SECONDS": 15,
     "DISCORD_WAIT_SECONDS": 8,
     "DISCORD_POLL_INTERVAL_SECONDS": 0.25,
+    # Once any of these exist the About page is considered rendered; after
+    # DISCORD_RENDER_SETTLE_SECONDS with no invite we stop waiting.
+    "DISCORD_RENDERED_SELECTORS": [
+        "[data-a-target='about-panel']",
+        ".about-section",
+        ".channel-panels",
+        "[data-test-selector='channel_panel_test_selector']",
+    ],
+    "DISCORD_RENDER_SETTLE_SECONDS": 1.0,
     "PAGE_LOAD_STRATEGY": "eager",          # normal | eager | none
+    "DISCORD_DETECT_MODE": "observer",      # observer (in-page watcher) | poll (page_source)
     "SCRAPE_WORKERS": 3,
     "SCRAPE_TIMEOUT_PER_CHANNEL": 30,
     "STREAMS_PAGE_SIZE": 100,               # Twitch max = 100
+    # Helix stream pages fetched ahead of the discovery loop
+    "STREAMS_PREFETCH_PAGES": 3,
+    # Printed pages whose Discord scrapes may run ahead of the one being shown (0 = lockstep)
+    "PIPELINE_PREFETCH_PAGES": 2,
+
+    # "http" reads About panels from Twitch's JSON API and only opens Chrome
+    # when that is inconclusive; "selenium" always renders the page.
+    "SCRAPE_BACKEND": "http",
+    "HTTP_BATCH_SIZE": 20,
+
+    # Warm Chrome pool: recycle a driver after this many pages / this much memory (0 = never)
+    "DRIVER_MAX_PAGES": 50,
+    "DRIVER_MAX_MEMORY_MB": 768,
+
+    # DevTools request blocking for scraping browsers (players, fonts, analytics, ...)
+    "NETWORK_BLOCKING": True,
+    "BLOCKED_URL_PATTERNS": list(DEFAULT_BLOCKED_URL_PATTERNS),
+    "BLOCKED_RESOURCE_TYPES": list(DEFAULT_BLOCKED_RESOURCE_TYPES),
+
+    # One reusable Chrome profile (disk + code cache) per pool slot.
+    # Empty dir = browser_profiles/ next to main.py. Caches over the MB cap are wiped on relaunch.
+    "BROWSER_PROFILE_CACHE": True,
+    "BROWSER_PROFILE_DIR": "",
+    "BROWSER_PROFILE_MAX_MB": 300,
 
     # New: prints what Selenium/Twitch/Discord steps are doing
     "VERBOSE": False,
 
-    # New: if True, cache empty results too (useful for debugging)
+    # If False, a channel must come back empty twice in a row before "no Discord" is cached
+    # (failures and missing channels are always cached, with short/long TTLs)
     "CACHE_EMPTY_RESULTS": True,
+
+    # sqlite (discord_cache.db, imports discord_cache.json once) | json (discord_cache.json)
+    # | redis (a Redis-protocol server shared by several hosts, with discord_cache.db as local cache)
+    "CACHE_BACKEND": "sqlite",
+    "CACHE_REDIS_URL": "redis://127.0.0.1:6379/0",
+    "CACHE_REDIS_PREFIX": "community_finder:discord:",
+    # Size bounds for the Discord cache (0 = unbounded); least recently used entries go first.
+    "CACHE_MAX_ENTRIES": 0,
+    "CACHE_MAX_MB": 0,
+
+    # Stale-while-revalidate: an expired entry with links is still shown for this long
+    # while it is rescraped in the background (0 = off).
+    "DISCORD_STALE_GRACE_SECONDS": 3 * 24 * 3600,
+    # Channels looked up at least DISCORD_REFRESH_MIN_HITS times over the cache entry's
+    # lifetime (counted across runs) are rescraped in the background once within this
+    # long of expiring (0 = off).
+    "DISCORD_REFRESH_AHEAD_SECONDS": 12 * 3600,
+    "DISCORD_REFRESH_MIN_HITS": 3,
 }
 
 DISCORD_CACHE_TTL_SECONDS = 7 * 24 * 3600
+# Negative results back off: each repeat of the same status multiplies the TTL, up to the cap.
+DISCORD_CACHE_BACKOFF_FACTOR = 4
+# Page rendered, no invite
 DISCORD_EMPTY_CACHE_TTL_SECONDS = 15 * 60
+DISCORD_EMPTY_CACHE_MAX_TTL_SECONDS = 14 * 24 * 3600
+# Timeouts, driver/page errors, watchdog kills: worth retrying soon
+DISCORD_FAILED_CACHE_TTL_SECONDS = 5 * 60
+DISCORD_FAILED_CACHE_MAX_TTL_SECONDS = 2 * 3600
+# Selenium also reports "timed-out" when the page loaded but none of
+# DISCORD_RENDERED_SELECTORS ever matched (e.g. a channel without panels):
+# after this many in a row, or after an empty result, it is cached as empty.
+DISCORD_TIMED_OUT_AS_EMPTY_AFTER = 3
+# Twitch says the channel doesn't exist (renamed, deleted, banned)
+DISCORD_MISSING_CACHE_TTL_SECONDS = 30 * 24 * 3600
+# Background rescrapes of the same channel are at least this far apart (failed revalidations aren't hammered).
+DISCORD_REFRESH_RETRY_SECONDS = 10 * 60
+# Expired entries are deleted at most this often (plus once when the cache is opened).
+DISCORD_CACHE_PURGE_INTERVAL_SECONDS = 10 * 60
+
+# The follow index is re-downloaded in full at least this often (renames, and
+# unfollows that a changed total alone would not reveal).
+FOLLOW_INDEX_RECONCILE_SECONDS = 24 * 3600
+
+# Why a Discord scrape ended; stored on cache entries as "outcome".
+OUTCOME_FOUND = "found"
+OUTCOME_RENDERED_EMPTY = "rendered-empty"
+OUTCOME_TIMED_OUT = "timed-out"
+OUTCOME_ERROR = "error"
+# Killed by the per-channel watchdog (SCRAPE_TIMEOUT_PER_CHANNEL)
+OUTCOME_HARD_TIMEOUT = "hard-timeout"
+OUTCOME_MISSING = "missing"
+
+# What an entry means for caching; stored as "status" next to "attempts"
+# (how many scrapes in a row ended with this status).
+STATUS_FOUND = "found"
+STATUS_EMPTY = "empty"
+STATUS_FAILED = "failed"
+STATUS_MISSING = "missing"
+
+OUTCOME_STATUS = {
+    OUTCOME_FOUND: STATUS_FOUND,
+    OUTCOME_RENDERED_EMPTY: STATUS_EMPTY,
+    OUTCOME_TIMED_OUT: STATUS_FAILED,
+    OUTCOME_ERROR: STATUS_FAILED,
+    OUTCOME_HARD_TIMEOUT: STATUS_FAILED,
+    OUTCOME_MISSING: STATUS_MISSING,
+}
 
 
 def _read_json_file(path: str) -> dict[str, Any] | None:
@@ -34,12 +172,36 @@ def _read_json_file(path: str) -> dict[str, Any] | None:
         return None
 
 
+def _replace_file(src: str, dst: str) -> None:
+    # Windows refuses to replace a file another process has open; that only lasts a moment.
+    for attempt in range(10):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == 9:
+                raise
+            time.sleep(0.05 * (attempt + 1))
+
+
 def _write_json_file(path: str, data: dict[str, Any]) -> None:
+    # Written to a temp file next to the target and renamed over it,
+    # so a crash or a concurrent reader never sees a half-written file.
     try:
-        with open(path, "w", encoding="utf-8") as f:
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
             json.dump(data, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        _replace_file(tmp, path)
     except OSError:
-        pass
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
 
 
 def load_filters() -> dict[str, Any]:
@@ -79,15 +241,40 @@ def load_config() -> dict[str, Any]:
         "SCRAPE_WORKERS",
         "SCRAPE_TIMEOUT_PER_CHANNEL",
         "STREAMS_PAGE_SIZE",
+        "STREAMS_PREFETCH_PAGES",
+        "HTTP_BATCH_SIZE",
+        "BROWSER_PROFILE_MAX_MB",
+        "DISCORD_REFRESH_MIN_HITS",
     ]:
         v = data.get(k, cfg[k])
         if isinstance(v, int) and v > 0:
             cfg[k] = v
 
+    for k in [
+        "PIPELINE_PREFETCH_PAGES",
+        "DRIVER_MAX_PAGES",
+        "DRIVER_MAX_MEMORY_MB",
+        "CACHE_MAX_ENTRIES",
+        "CACHE_MAX_MB",
+        "DISCORD_STALE_GRACE_SECONDS",
+        "DISCORD_REFRESH_AHEAD_SECONDS",
+    ]:
+        v = data.get(k, cfg[k])
+        if isinstance(v, int) and v >= 0:
+            cfg[k] = v
+
     v = data.get("DISCORD_POLL_INTERVAL_SECONDS", cfg["DISCORD_POLL_INTERVAL_SECONDS"])
     if isinstance(v, (int, float)) and float(v) > 0:
         cfg["DISCORD_POLL_INTERVAL_SECONDS"] = float(v)
 
+    v = data.get("DISCORD_RENDER_SETTLE_SECONDS", cfg["DISCORD_RENDER_SETTLE_SECONDS"])
+    if isinstance(v, (int, float)) and float(v) >= 0:
+        cfg["DISCORD_RENDER_SETTLE_SECONDS"] = float(v)
+
+    sels = data.get("DISCORD_RENDERED_SELECTORS", cfg["DISCORD_RENDERED_SELECTORS"])
+    if isinstance(sels, list) and all(isinstance(x, str) and x.strip() for x in sels):
+        cfg["DISCORD_RENDERED_SELECTORS"] = [x.strip() for x in sels]
+
     strat = str(data.get("PAGE_LOAD_STRATEGY", cfg["PAGE_LOAD_STRATEGY"])).lower().strip()
     if strat in ("normal", "eager", "none"):
         cfg["PAGE_LOAD_STRATEGY"] = strat
@@ -95,6 +282,43 @@ def load_config() -> dict[str, Any]:
     if cfg["STREAMS_PAGE_SIZE"] > 100:
         cfg["STREAMS_PAGE_SIZE"] = 100
 
+    mode = str(data.get("DISCORD_DETECT_MODE", cfg["DISCORD_DETECT_MODE"])).lower().strip()
+    if mode in ("observer", "poll"):
+        cfg["DISCORD_DETECT_MODE"] = mode
+
+    cb = str(data.get("CACHE_BACKEND", cfg["CACHE_BACKEND"])).lower().strip()
+    if cb in ("sqlite", "json", "redis"):
+        cfg["CACHE_BACKEND"] = cb
+
+    for k in ["CACHE_REDIS_URL", "CACHE_REDIS_PREFIX"]:
+        v = data.get(k, cfg[k])
+        if isinstance(v, str) and v.strip():
+            cfg[k] = v.strip()
+
+    backend = str(data.get("SCRAPE_BACKEND", cfg["SCRAPE_BACKEND"])).lower().strip()
+    if backend in ("http", "selenium"):
+        cfg["SCRAPE_BACKEND"] = backend
+
+    pats = data.get("BLOCKED_URL_PATTERNS", cfg["BLOCKED_URL_PATTERNS"])
+    if isinstance(pats, list) and all(isinstance(x, str) and x.strip() for x in pats):
+        cfg["BLOCKED_URL_PATTERNS"] = [x.strip() for x in pats]
+
+    rtypes = data.get("BLOCKED_RESOURCE_TYPES", cfg["BLOCKED_RESOURCE_TYPES"])
+    if isinstance(rtypes, list) and all(isinstance(x, str) for x in rtypes):
+        cfg["BLOCKED_RESOURCE_TYPES"] = [x.lower().strip() for x in rtypes if x.lower().strip() in RESOURCE_TYPE_PATTERNS]
+
+    nb = data.get("NETWORK_BLOCKING", cfg["NETWORK_BLOCKING"])
+    if isinstance(nb, bool):
+        cfg["NETWORK_BLOCKING"] = nb
+
+    pc = data.get("BROWSER_PROFILE_CACHE", cfg["BROWSER_PROFILE_CACHE"])
+    if isinstance(pc, bool):
+        cfg["BROWSER_PROFILE_CACHE"] = pc
+
+    pdir = data.get("BROWSER_PROFILE_DIR", cfg["BROWSER_PROFILE_DIR"])
+    if isinstance(pdir, str):
+        cfg["BROWSER_PROFILE_DIR"] = pdir.strip()
+
     vb = data.get("VERBOSE", cfg["VERBOSE"])
     if isinstance(vb, bool):
         cfg["VERBOSE"] = vb
@@ -111,12 +335,35 @@ def save_config(cfg: dict[str, Any]) -> None:
         "PAGE_LOAD_TIMEOUT_SECONDS": int(cfg["PAGE_LOAD_TIMEOUT_SECONDS"]),
         "DISCORD_WAIT_SECONDS": int(cfg["DISCORD_WAIT_SECONDS"]),
         "DISCORD_POLL_INTERVAL_SECONDS": float(cfg["DISCORD_POLL_INTERVAL_SECONDS"]),
+        "DISCORD_RENDERED_SELECTORS": list(cfg["DISCORD_RENDERED_SELECTORS"]),
+        "DISCORD_RENDER_SETTLE_SECONDS": float(cfg["DISCORD_RENDER_SETTLE_SECONDS"]),
         "PAGE_LOAD_STRATEGY": str(cfg["PAGE_LOAD_STRATEGY"]),
+        "DISCORD_DETECT_MODE": str(cfg["DISCORD_DETECT_MODE"]),
         "SCRAPE_WORKERS": int(cfg["SCRAPE_WORKERS"]),
         "SCRAPE_TIMEOUT_PER_CHANNEL": int(cfg["SCRAPE_TIMEOUT_PER_CHANNEL"]),
         "STREAMS_PAGE_SIZE": int(cfg["STREAMS_PAGE_SIZE"]),
+        "STREAMS_PREFETCH_PAGES": int(cfg["STREAMS_PREFETCH_PAGES"]),
+        "PIPELINE_PREFETCH_PAGES": int(cfg["PIPELINE_PREFETCH_PAGES"]),
+        "SCRAPE_BACKEND": str(cfg["SCRAPE_BACKEND"]),
+        "HTTP_BATCH_SIZE": int(cfg["HTTP_BATCH_SIZE"]),
+        "DRIVER_MAX_PAGES": int(cfg["DRIVER_MAX_PAGES"]),
+        "DRIVER_MAX_MEMORY_MB": int(cfg["DRIVER_MAX_MEMORY_MB"]),
+        "NETWORK_BLOCKING": bool(cfg["NETWORK_BLOCKING"]),
+        "BLOCKED_URL_PATTERNS": list(cfg["BLOCKED_URL_PATTERNS"]),
+        "BLOCKED_RESOURCE_TYPES": list(cfg["BLOCKED_RESOURCE_TYPES"]),
+        "BROWSER_PROFILE_CACHE": bool(cfg["BROWSER_PROFILE_CACHE"]),
+        "BROWSER_PROFILE_DIR": str(cfg["BROWSER_PROFILE_DIR"]),
+        "BROWSER_PROFILE_MAX_MB": int(cfg["BROWSER_PROFILE_MAX_MB"]),
         "VERBOSE": bool(cfg.get("VERBOSE", False)),
         "CACHE_EMPTY_RESULTS": bool(cfg.get("CACHE_EMPTY_RESULTS", True)),
+        "CACHE_BACKEND": str(cfg["CACHE_BACKEND"]),
+        "CACHE_REDIS_URL": str(cfg["CACHE_REDIS_URL"]),
+        "CACHE_REDIS_PREFIX": str(cfg["CACHE_REDIS_PREFIX"]),
+        "CACHE_MAX_ENTRIES": int(cfg["CACHE_MAX_ENTRIES"]),
+        "CACHE_MAX_MB": int(cfg["CACHE_MAX_MB"]),
+        "DISCORD_STALE_GRACE_SECONDS": int(cfg["DISCORD_STALE_GRACE_SECONDS"]),
+        "DISCORD_REFRESH_AHEAD_SECONDS": int(cfg["DISCORD_REFRESH_AHEAD_SECONDS"]),
+        "DISCORD_REFRESH_MIN_HITS": int(cfg["DISCORD_REFRESH_MIN_HITS"]),
     }
     if payload["STREAMS_PAGE_SIZE"] > 100:
         payload["STREAMS_PAGE_SIZE"] = 100
@@ -124,7 +371,19 @@ def save_config(cfg: dict[str, Any]) -> None:
 
 
 def load_discord_cache() -> dict[str, Any]:
-    data = _read_json_file(DISCORD_CACHE_PATH)
+    try:
+        with open(DISCORD_CACHE_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except OSError:
+        return {}
+    except json.JSONDecodeError:
+        # Unreadable (e.g. truncated by an older version): keep it aside instead of
+        # letting the next save replace it with an empty cache.
+        try:
+            os.replace(DISCORD_CACHE_PATH, f"{DISCORD_CACHE_PATH}.corrupt-{int(time.time())}")
+        except OSError:
+            pass
+        return {}
     return data if isinstance(data, dict) else {}
 
 
@@ -132,3 +391,14 @@ def save_discord_cache(cache: dict[str, Any]) -> None:
     if not isinstance(cache, dict):
         return
     _write_json_file(DISCORD_CACHE_PATH, cache)
+
+
+def load_follow_index() -> dict[str, Any]:
+    """{user_id: {"follows": [...newest first], "total": int, "synced_at": ts, "reconciled_at": ts}}"""
+    return _read_json_file(FOLLOW_INDEX_PATH) or {}
+
+
+def save_follow_index(index: dict[str, Any]) -> None:
+    if not isinstance(index, dict):
+        return
+    _write_json_file(FOLLOW_INDEX_PATH, index)
@@ -0,0 +1,224 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+import requests
+
+from .helix import get_helix_client
+from .oauth_device import (
+    USER_TOKEN_PATH,
+    device_authorize,
+    device_poll_token,
+    refresh_user_token,
+)
+from .paths import APP_TOKEN_PATH
+from .settings import load_settings
+from .twitch_api import request_app_token
+
+# Renew a token this long before it expires.
+TOKEN_REFRESH_MARGIN_SECONDS = 300
+# A token read back from disk is re-checked against /oauth2/validate at most
+# this often (Twitch asks apps to validate at least hourly).
+TOKEN_VALIDATE_INTERVAL_SECONDS = 3600
+# If /oauth2/validate can't be reached (network error, 5xx), the stored token
+# keeps being used and validation is retried after this long.
+TOKEN_VALIDATE_RETRY_SECONDS = 300
+
+
+def _read_token(path: str) -> dict[str, Any] | None:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if isinstance(data, dict) and isinstance(data.get("access_token"), str) and data["access_token"]:
+        return data
+    return None
+
+
+def _write_token(path: str, data: dict[str, Any]) -> None:
+    # Atomic, and readable by the owner only: these are credentials.
+    fd, tmp = tempfile.mkstemp(prefix=os.path.basename(path) + ".", suffix=".tmp", dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+
+
+class TokenManager(ABC):
+    """
+    One OAuth token, kept in memory and on disk together with its expiry.
+
+    access_token() makes no request while the token is known to be good.
+    It renews the token once it is within TOKEN_REFRESH_MARGIN_SECONDS of
+    expiring. A token whose expiry is unknown or whose last check is older
+    than TOKEN_VALIDATE_INTERVAL_SECONDS is validated first. on_unauthorized()
+    handles a 401 mid-run. Thread-safe: concurrent callers share one renewal.
+    """
+
+    def __init__(self, path: str, verbose: bool = False) -> None:
+        self.path = path
+        self.verbose = verbose
+        self._lock = threading.RLock()
+        self._data: dict[str, Any] | None = None
+        self._loaded = False
+        self._validate_after = 0.0
+        self.stats = {"reused": 0, "validated": 0, "renewed": 0, "unauthorized": 0}
+
+    def _v(self, msg: str) -> None:
+        if self.verbose:
+            print(f"[VERBOSE] {msg}")
+
+    @abstractmethod
+    def _renew(self, current: dict[str, Any] | None) -> dict[str, Any]:
+        """A new token response ({"access_token", "expires_in", ...}) from Twitch."""
+
+    def _acceptable(self, data: dict[str, Any]) -> bool:
+        """Whether a stored token can serve this manager at all (same app, enough scopes)."""
+        return data.get("client_id") in (None, load_settings()["TWITCH_CLIENT_ID"])
+
+    def _usable(self, data: dict[str, Any] | None, now: float) -> bool:
+        if not data or not self._acceptable(data):
+            return False
+        expires_at = data.get("expires_at")
+        validated_at = data.get("validated_at")
+        return (
+            isinstance(expires_at, (int, float))
+            and expires_at - now > TOKEN_REFRESH_MARGIN_SECONDS
+            and isinstance(validated_at, (int, float))
+            and now - validated_at < TOKEN_VALIDATE_INTERVAL_SECONDS
+        )
+
+    def _store(self, data: dict[str, Any], now: float) -> None:
+        data["client_id"] = data.get("client_id") or load_settings()["TWITCH_CLIENT_ID"]
+        data["validated_at"] = now
+        self._data = data
+        _write_token(self.path, data)
+
+    def cached(self) -> str | None:
+        """The token if it can be used as is; never blocks or makes a request."""
+        data = self._data
+        return data["access_token"] if data and self._usable(data, time.time()) else None
+
+    def access_token(self) -> str:
+        with self._lock:
+            if not self._loaded:
+                self._data = _read_token(self.path)
+                self._loaded = True
+
+            now = time.time()
+            data = self._data
+            if data and self._usable(data, now):
+                self.stats["reused"] += 1
+                return data["access_token"]
+
+            expires_at = data.get("expires_at") if data else None
+            near_expiry = isinstance(expires_at, (int, float)) and expires_at - now <= TOKEN_REFRESH_MARGIN_SECONDS
+            if data and self._acceptable(data) and not near_expiry:
+                if now < self._validate_after:
+                    self.stats["reused"] += 1
+                    return data["access_token"]
+                # Unverified for a while, or saved without an expiry (older versions): ask Twitch.
+                try:
+                    info = get_helix_client().validate_token(data["access_token"])
+                except requests.RequestException as e:
+                    # Not a verdict on the token: keep it (a 401 still renews it) and ask again later.
+                    self._v(f"Could not validate {os.path.basename(self.path)}, using it as is: {e}")
+                    self._validate_after = now + TOKEN_VALIDATE_RETRY_SECONDS
+                    self.stats["reused"] += 1
+                    return data["access_token"]
+                self.stats["validated"] += 1
+                if info is not None and info.get("client_id") == load_settings()["TWITCH_CLIENT_ID"]:
+                    data["expires_at"] = now + float(info.get("expires_in", 0))
+                    if "scopes" in info:
+                        data["scope"] = list(info["scopes"] or [])
+                    self._store(data, now)
+                    if self._usable(data, now):
+                        return data["access_token"]
+
+            self._v(f"Renewing token in {os.path.basename(self.path)}")
+            fresh = self._renew(data)
+            fresh["expires_at"] = now + float(fresh.get("expires_in", 0))
+            self._store(fresh, now)
+            self.stats["renewed"] += 1
+            return fresh["access_token"]
+
+    def on_unauthorized(self, token: str) -> None:
+        """Twitch rejected token: the next access_token() renews it (once, however many callers saw the 401)."""
+        with self._lock:
+            self.stats["unauthorized"] += 1
+            if self._data is not None and self._data.get("access_token") == token:
+                self._data["expires_at"] = 0
+
+
+class AppTokenManager(TokenManager):
+    """The client_credentials token (app_token.json)."""
+
+    def __init__(self, verbose: bool = False) -> None:
+        super().__init__(APP_TOKEN_PATH, verbose)
+
+    def _renew(self, current: dict[str, Any] | None) -> dict[str, Any]:
+        return request_app_token()
+
+
+class UserTokenManager(TokenManager):
+    """
+    The device-flow user token (user_token.json). Renewal uses the refresh
+    token and falls back to the device flow, which prompts.
+    """
+
+    def __init__(self, scopes: list[str], verbose: bool = False) -> None:
+        super().__init__(USER_TOKEN_PATH, verbose)
+        self.scopes = list(scopes)
+
+    def _acceptable(self, data: dict[str, Any]) -> bool:
+        granted = data.get("scope") or []
+        return super()._acceptable(data) and all(s in granted for s in self.scopes)
+
+    def _renew(self, current: dict[str, Any] | None) -> dict[str, Any]:
+        if current and self._acceptable(current) and isinstance(current.get("refresh_token"), str):
+            try:
+                return refresh_user_token(current["refresh_token"], verbose=self.verbose)
+            except Exception as e:
+                self._v(f"Refresh failed, falling back to device flow: {e}")
+
+        d = device_authorize(self.scopes, verbose=self.verbose)
+
+        print("\n=== Twitch Authorization Required ===")
+        print(f"Open: {d.get('verification_uri')}")
+        print(f"Enter code: {d.get('user_code')}")
+        print("Approve access in the browser.\n")
+
+        return device_poll_token(d["device_code"], int(d.get("interval", 5)), verbose=self.verbose)
+
+
+_app_tokens: AppTokenManager | None = None
+_user_tokens: dict[tuple[str, ...], UserTokenManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_app_tokens() -> AppTokenManager:
+    global _app_tokens
+    with _managers_lock:
+        if _app_tokens is None:
+            _app_tokens = AppTokenManager()
+        return _app_tokens
+
+
+def get_user_tokens(scopes: list[str], verbose: bool = False) -> UserTokenManager:
+    key = tuple(sorted(scopes))
+    with _managers_lock:
+        mgr = _user_tokens.get(key)
+        if mgr is None:
+            mgr = _user_tokens[key] = UserTokenManager(scopes)
+        mgr.verbose = verbose
+        return mgr
@@ -0,0 +1,200 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, AsyncIterator
+
+import requests
+
+from .helix import TokenSource, backoff_delay, get_async_helix_client
+
+# Bulk lookups run this many 100-item chunks at once; the shared token
+# bucket in the Helix client still paces the actual requests.
+BULK_WORKERS = 6
+# Extra attempts per chunk for dropped connections/timeouts (HTTP 429/5xx are retried by the client).
+BULK_CHUNK_RETRIES = 2
+
+
+async def twitch_get(token, url: str, params: Any) -> dict[str, Any]:
+    return await get_async_helix_client().get(token, url, params)
+
+
+async def get_game_id(token: str | TokenSource, game_name: str) -> str:
+    data = await twitch_get(token, "https://api.twitch.tv/helix/games", {"name": game_name})
+    if not data.get("data"):
+        raise RuntimeError(f"Game not found: {game_name}")
+    return data["data"][0]["id"]
+
+
+async def iter_pages(token: str | TokenSource, url: str, params: dict[str, Any]) -> AsyncIterator[dict[str, Any]]:
+    """Yields each page of a cursor-paginated Helix endpoint until it runs dry."""
+    after: str | None = None
+    while True:
+        page_params = dict(params)
+        if after:
+            page_params["after"] = after
+        page = await twitch_get(token, url, page_params)
+        if not page.get("data"):
+            return
+        yield page
+
+        after = (page.get("pagination", {}) or {}).get("cursor")
+        if not after:
+            return
+
+
+class _End:
+    def __init__(self, error: BaseException | None = None) -> None:
+        self.error = error
+
+
+class StreamsPaginator:
+    """
+    /helix/streams for one game, read ahead: a producer task keeps up to
+    `prefetch` pages fetched beyond the one being consumed. Cursors only
+    come from the previous page, so the look-ahead is sequential, but the
+    consumer only waits on Helix when it outpaces it. At most `prefetch`
+    pages are buffered or being fetched at once: the producer takes a slot
+    before each request and the consumer frees it on taking the page.
+    Iterate for streams as they arrive, or use pages().
+    """
+
+    def __init__(self, token: str | TokenSource, game_id: str, language: str, first: int, prefetch: int) -> None:
+        self._params: dict[str, Any] = {"game_id": game_id, "first": first}
+        if language:
+            self._params["language"] = language
+        self._token = token
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(max(1, int(prefetch)))
+        self._producer: asyncio.Task | None = None
+        self._fetching = False
+        self._latencies: deque[float] = deque(maxlen=1000)  # recent pages only
+        self.stats = {"pages": 0, "streams": 0, "consumer_waits": 0, "consumer_wait_seconds": 0.0}
+
+    async def __aenter__(self) -> "StreamsPaginator":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self.aclose()
+
+    async def _produce(self) -> None:
+        try:
+            pages = iter_pages(self._token, "https://api.twitch.tv/helix/streams", self._params)
+            while True:
+                await self._slots.acquire()
+                self._fetching = True
+                t0 = time.monotonic()
+                try:
+                    page = await anext(pages)
+                except StopAsyncIteration:
+                    break
+                finally:
+                    self._fetching = False
+                self._latencies.append(time.monotonic() - t0)
+                self.stats["pages"] += 1
+                await self._queue.put(page)
+        except Exception as e:
+            await self._queue.put(_End(e))
+            return
+        await self._queue.put(_End())
+
+    async def pages(self) -> AsyncIterator[dict[str, Any]]:
+        if self._producer is None:
+            self._producer = asyncio.ensure_future(self._produce())
+        while True:
+            if self._queue.empty():
+                t0 = time.monotonic()
+                item = await self._queue.get()
+                self.stats["consumer_waits"] += 1
+                self.stats["consumer_wait_seconds"] += time.monotonic() - t0
+            else:
+                item = self._queue.get_nowait()
+            if isinstance(item, _End):
+                if item.error is not None:
+                    raise item.error
+                return
+            self._slots.release()
+            self.stats["streams"] += len(item["data"])
+            yield item
+
+    async def __aiter__(self) -> AsyncIterator[dict[str, Any]]:
+        async for page in self.pages():
+            for stream in page["data"]:
+                yield stream
+
+    def in_flight(self) -> int:
+        """Pages fetched but not consumed yet, plus the request under way."""
+        return self._queue.qsize() + (1 if self._fetching else 0)
+
+    def latency_stats(self) -> dict[str, float]:
+        lat = sorted(self._latencies)
+        if not lat:
+            return {"avg_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+        return {
+            "avg_ms": round(sum(lat) / len(lat) * 1000, 1),
+            "p95_ms": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))] * 1000, 1),
+            "max_ms": round(lat[-1] * 1000, 1),
+        }
+
+    def stats_line(self) -> str:
+        lat = self.latency_stats()
+        return (
+            f"Helix streams: {self.stats['pages']} pages, {self.stats['streams']} streams | "
+            f"page latency avg {lat['avg_ms']:.0f} ms, p95 {lat['p95_ms']:.0f} ms | "
+            f"{self.in_flight()} in flight | waited on Helix {self.stats['consumer_waits']}x "
+            f"({self.stats['consumer_wait_seconds']:.1f}s)"
+        )
+
+    async def aclose(self) -> None:
+        if self._producer is not None and not self._producer.done():
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
+
+
+async def _get_chunk(
+    token: str | TokenSource, url: str, params: list[tuple[str, str]], slots: asyncio.Semaphore
+) -> list[dict[str, Any]]:
+    async with slots:
+        for attempt in range(BULK_CHUNK_RETRIES + 1):
+            try:
+                return (await twitch_get(token, url, params)).get("data", []) or []
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= BULK_CHUNK_RETRIES:
+                    raise
+            await asyncio.sleep(backoff_delay(attempt + 1))
+    return []
+
+
+async def _get_chunked(token: str | TokenSource, url: str, key: str, values: list[str]) -> list[dict[str, Any]]:
+    """
+    Helix list endpoints take up to 100 repeated ?key= params per call.
+    Chunks run concurrently; results are merged in input order. If any
+    chunk still fails after its retries, the rest are cancelled and its
+    error is raised.
+    """
+    slots = asyncio.Semaphore(BULK_WORKERS)
+    tasks = [
+        asyncio.ensure_future(_get_chunk(token, url, [(key, x) for x in values[i : i + 100]], slots))
+        for i in range(0, len(values), 100)
+    ]
+    try:
+        pages = await asyncio.gather(*tasks)
+    except BaseException:
+        for t in tasks:
+            t.cancel()
+        raise
+    return [item for page in pages for item in page]
+
+
+async def get_users_by_login(token: str | TokenSource, logins: list[str]) -> list[dict[str, Any]]:
+    return await _get_chunked(token, "https://api.twitch.tv/helix/users", "login", logins)
+
+
+async def get_users_by_ids(token: str | TokenSource, ids: list[str]) -> list[dict[str, Any]]:
+    return await _get_chunked(token, "https://api.twitch.tv/helix/users", "id", ids)
+
+
+async def get_streams_by_user_ids(token: str | TokenSource, user_ids: list[str]) -> list[dict[str, Any]]:
+    return await _get_chunked(token, "https://api.twitch.tv/helix/streams", "user_id", user_ids)
@@ -1,6 +1,9 @@
+from community_finder.cli import main as cli_main
 from community_finder.runners import App
 
 def main() -> None:
+    if cli_main():
+        return
     App().run()
 
 if __name__ == "__main__":
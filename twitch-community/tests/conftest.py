@@ -0,0 +1,27 @@
+import pytest
+
+from community_finder import cache_store
+
+from fake_resp import FakeRespServer
+
+
+@pytest.fixture
+def resp_server():
+    with FakeRespServer() as server:
+        yield server
+
+
+@pytest.fixture
+def local_store_factory(tmp_path, monkeypatch):
+    # Keep the one-time JSON import away from a real discord_cache.json.
+    monkeypatch.setattr(cache_store, "DISCORD_CACHE_PATH", str(tmp_path / "discord_cache.json"))
+    stores = []
+
+    def make(name: str = "local") -> cache_store.SqliteCacheStore:
+        store = cache_store.SqliteCacheStore(str(tmp_path / f"{name}.db"))
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
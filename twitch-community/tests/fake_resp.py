@@ -0,0 +1,93 @@
+import socketserver
+import threading
+import time
+from typing import Any
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "_Server"
+
+    def _read_command(self) -> list[bytes] | None:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:])):
+            n = int(self.rfile.readline()[1:])
+            args.append(self.rfile.read(n + 2)[:-2])
+        return args
+
+    def handle(self) -> None:
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            self.wfile.write(self.server.fake.reply(args))
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    fake: "FakeRespServer"
+
+
+def _bulk(value: bytes | None) -> bytes:
+    return b"$-1\r\n" if value is None else b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class FakeRespServer:
+    """
+    In-process stand-in for a Redis server: GET, MGET, SET (with PX), INCRBY
+    and AUTH/SELECT over RESP2 on a local port. Every command is logged in
+    `commands` (name first, as str) so tests can count round-trips.
+    """
+
+    def __init__(self) -> None:
+        self.data: dict[bytes, tuple[bytes, float]] = {}  # key -> (value, expiry; 0 = none)
+        self.commands: list[list[Any]] = []
+        self._lock = threading.Lock()
+        self._server = _Server(("127.0.0.1", 0), _Handler)
+        self._server.fake = self
+        self.url = f"redis://127.0.0.1:{self._server.server_address[1]}/0"
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    def __enter__(self) -> "FakeRespServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _value(self, key: bytes) -> bytes | None:
+        value, expires = self.data.get(key, (None, 0.0))
+        if value is not None and expires and expires <= time.time():
+            del self.data[key]
+            return None
+        return value
+
+    def reply(self, args: list[bytes]) -> bytes:
+        cmd = args[0].decode().upper()
+        with self._lock:
+            self.commands.append([cmd, *args[1:]])
+            if cmd == "GET":
+                return _bulk(self._value(args[1]))
+            if cmd == "MGET":
+                return b"*%d\r\n" % (len(args) - 1) + b"".join(_bulk(self._value(k)) for k in args[1:])
+            if cmd == "SET":
+                expires = 0.0
+                if len(args) >= 5 and args[3].upper() == b"PX":
+                    expires = time.time() + int(args[4]) / 1000
+                self.data[args[1]] = (args[2], expires)
+                return b"+OK\r\n"
+            if cmd == "INCRBY":
+                n = int(self._value(args[1]) or b"0") + int(args[2])
+                self.data[args[1]] = (str(n).encode(), 0.0)
+                return b":%d\r\n" % n
+            if cmd in ("AUTH", "SELECT"):
+                return b"+OK\r\n"
+        return b"-ERR unknown command '%s'\r\n" % cmd.encode()
+
+    def count(self, cmd: str) -> int:
+        with self._lock:
+            return sum(1 for c in self.commands if c[0] == cmd)
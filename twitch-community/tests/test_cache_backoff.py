@@ -0,0 +1,54 @@
+import pytest
+
+from community_finder import discord
+from community_finder.state import (
+    DISCORD_EMPTY_CACHE_TTL_SECONDS,
+    DISCORD_FAILED_CACHE_TTL_SECONDS,
+    DISCORD_TIMED_OUT_AS_EMPTY_AFTER,
+)
+
+CFG = {"VERBOSE": False, "CACHE_EMPTY_RESULTS": True}
+
+
+@pytest.fixture
+def store(local_store_factory, monkeypatch):
+    s = local_store_factory()
+    monkeypatch.setattr(discord, "_cache_store", s)
+    return s
+
+
+def test_repeated_selector_timeouts_back_off_as_empty(store):
+    seen = []
+    for _ in range(DISCORD_TIMED_OUT_AS_EMPTY_AFTER + 1):
+        discord.cache_set(CFG, "NoPanels", [], "timed-out")
+        e = store.get("nopanels", touch=False)
+        seen.append((e["status"], e["attempts"], e["ttl"]))
+
+    failed = [s for s in seen if s[0] == "failed"]
+    assert len(failed) == DISCORD_TIMED_OUT_AS_EMPTY_AFTER - 1
+    assert failed[0][2] == DISCORD_FAILED_CACHE_TTL_SECONDS
+    # Then it stays empty, and the empty TTL keeps growing.
+    assert seen[-2][:2] == ("empty", 1) and seen[-2][2] == DISCORD_EMPTY_CACHE_TTL_SECONDS
+    assert seen[-1][:2] == ("empty", 2) and seen[-1][2] > seen[-2][2]
+
+
+def test_timeout_after_an_empty_result_stays_empty(store):
+    discord.cache_set(CFG, "quiet", [], "rendered-empty")
+    discord.cache_set(CFG, "quiet", [], "timed-out")
+    e = store.get("quiet", touch=False)
+    assert (e["status"], e["attempts"]) == ("empty", 2)
+
+
+def test_errors_keep_the_short_failed_ttl(store):
+    for _ in range(DISCORD_TIMED_OUT_AS_EMPTY_AFTER + 1):
+        discord.cache_set(CFG, "flaky", [], "error")
+    e = store.get("flaky", touch=False)
+    assert e["status"] == "failed"
+
+
+def test_a_timeout_never_replaces_known_links(store):
+    discord.cache_set(CFG, "linked", ["https://discord.gg/x"], "found")
+    for _ in range(DISCORD_TIMED_OUT_AS_EMPTY_AFTER + 1):
+        discord.cache_set(CFG, "linked", [], "timed-out")
+    e = store.get("linked", touch=False)
+    assert (e["status"], e["links"]) == ("found", ["https://discord.gg/x"])
@@ -0,0 +1,50 @@
+import os
+import time
+
+import pytest
+
+from community_finder import cache_store, state
+
+
+@pytest.fixture
+def json_store(tmp_path, monkeypatch):
+    path = tmp_path / "discord_cache.json"
+    monkeypatch.setattr(state, "DISCORD_CACHE_PATH", str(path))
+    monkeypatch.setattr(cache_store, "DISCORD_CACHE_LOCK_PATH", str(tmp_path / "discord_cache.lock"))
+    store = cache_store.JsonCacheStore()
+    store.put("alice", {"ts": time.time(), "links": ["https://discord.gg/a"], "status": "found"})
+    store.flush()
+    return store, path
+
+
+def test_cache_hits_alone_do_not_rewrite_the_file(json_store):
+    store, path = json_store
+    before = os.stat(path).st_mtime_ns
+
+    assert store.get_many(["alice"])["alice"]["hits"] == 1
+    store.flush()
+    assert os.stat(path).st_mtime_ns == before
+
+
+def test_hits_ride_along_with_the_next_write(json_store):
+    store, path = json_store
+    store.get("alice")
+    store.put("bob", {"ts": time.time(), "links": [], "status": "empty"})
+    store.flush()
+
+    on_disk = state.load_discord_cache()
+    assert on_disk["alice"]["hits"] == 1
+    assert "bob" in on_disk
+
+
+def test_old_hits_and_close_are_written(json_store, monkeypatch):
+    store, path = json_store
+    store.get("alice")
+    monkeypatch.setattr(cache_store, "JSON_TOUCH_FLUSH_SECONDS", 0)
+    store.flush()
+    assert state.load_discord_cache()["alice"]["hits"] == 1
+
+    monkeypatch.setattr(cache_store, "JSON_TOUCH_FLUSH_SECONDS", 3600)
+    store.get("alice")
+    store.close()
+    assert state.load_discord_cache()["alice"]["hits"] == 2
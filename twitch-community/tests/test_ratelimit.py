@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+from community_finder.ratelimit import TokenBucket
+
+
+def _headers(limit, remaining, reset_in):
+    return {
+        "Ratelimit-Limit": str(limit),
+        "Ratelimit-Remaining": str(remaining),
+        "Ratelimit-Reset": str(time.time() + reset_in),
+    }
+
+
+def _take(bucket, n=1):
+    for _ in range(n):
+        assert bucket._try_take(0.0) == 0.0
+
+
+def test_headers_set_budget_and_refill_rate():
+    b = TokenBucket(limit=800, window=60)
+    _take(b)
+    b.update(_headers(800, 600, reset_in=20))
+
+    st = b.stats()
+    assert st["limit"] == 800
+    assert st["server_remaining"] == 600
+    assert 599 <= st["available"] <= 601
+    assert abs(st["refill_per_s"] - 10.0) < 0.1  # 200 missing points over 20 s
+
+
+def test_points_in_flight_are_taken_off_remaining():
+    b = TokenBucket()
+    _take(b, 5)
+    b.update(_headers(800, 700, reset_in=10))  # one reply; four requests still out
+    assert b.stats()["inflight"] == 4
+    assert b.stats()["available"] == 696
+
+
+def test_late_reply_does_not_reinflate_the_budget():
+    b = TokenBucket()
+    _take(b, 3)
+    reset = time.time() + 30
+    newer = {"Ratelimit-Limit": "800", "Ratelimit-Remaining": "100", "Ratelimit-Reset": str(reset)}
+    older_same_window = {**newer, "Ratelimit-Remaining": "400"}
+    older_window = {**newer, "Ratelimit-Remaining": "700", "Ratelimit-Reset": str(reset - 5)}
+
+    b.update(newer)
+    b.update(older_same_window)
+    b.update(older_window)
+
+    st = b.stats()
+    assert st["server_remaining"] == 100
+    assert st["available"] <= 100
+    assert st["inflight"] == 0
+
+
+def test_next_window_is_applied():
+    b = TokenBucket()
+    _take(b, 2)
+    b.update(_headers(800, 0, reset_in=1))
+    b.update(_headers(800, 790, reset_in=2))
+    assert b.stats()["server_remaining"] == 790
+
+
+def test_429_blocks_until_reset_even_when_out_of_order():
+    b = TokenBucket()
+    _take(b, 2)
+    b.update(_headers(800, 50, reset_in=5))
+    b.update(_headers(800, 300, reset_in=0.3), throttled=True)  # stale headers, but a real 429
+
+    assert b._try_take(0.0) > 0
+
+    async def wait():
+        return await b.acquire_async()
+
+    waited = asyncio.run(wait())
+    assert 0.2 <= waited < 5
+    assert b.stats()["waits"] == 1
+
+
+def test_missing_headers_only_release_the_point():
+    b = TokenBucket(limit=10, window=10)
+    _take(b)
+    b.update({})
+    st = b.stats()
+    assert st["inflight"] == 0
+    assert st["server_remaining"] is None
@@ -0,0 +1,167 @@
+import threading
+import time
+
+from community_finder import discord
+from community_finder.scheduler import ScrapeScheduler
+
+
+def _cfg(timeout=0.3, workers=1):
+    return {"SCRAPE_TIMEOUT_PER_CHANNEL": timeout, "SCRAPE_WORKERS": workers, "VERBOSE": False}
+
+
+class FakeDriver:
+    def __init__(self) -> None:
+        self.killed = threading.Event()
+
+
+class FakeLease:
+    def __init__(self) -> None:
+        self.driver = FakeDriver()
+        self.dead = False
+
+
+class FakePool:
+    """Checkout can be slowed down; kill() unblocks the scrape it belongs to."""
+
+    def __init__(self, checkout_seconds=0.0) -> None:
+        self.checkout_seconds = checkout_seconds
+        self.killed: list[FakeLease] = []
+        self.checked_in: list[FakeLease] = []
+        self.stats: dict = {}
+
+    def checkout(self) -> FakeLease:
+        time.sleep(self.checkout_seconds)
+        return FakeLease()
+
+    def kill(self, lease: FakeLease) -> None:
+        lease.dead = True
+        lease.driver.killed.set()
+        self.killed.append(lease)
+
+    def checkin(self, lease: FakeLease, broken: bool = False) -> None:
+        if not lease.dead:
+            self.checked_in.append(lease)
+
+
+def _scrape_until_killed(driver, cfg, login):
+    if driver.killed.wait(5):
+        raise RuntimeError("driver killed")
+    return [], "timed-out"
+
+
+def _scheduler(pool, monkeypatch, scrape):
+    monkeypatch.setattr(discord, "get_driver_pool", lambda cfg: pool)
+    monkeypatch.setattr("community_finder.about_selenium.extract_discord_about", scrape)
+    return ScrapeScheduler(discord._run_scrape_task, discord._kill_scrape_task, tick_seconds=0.02)
+
+
+def test_watchdog_kills_the_driver_of_a_stuck_scrape(monkeypatch):
+    pool = FakePool()
+    sched = _scheduler(pool, monkeypatch, _scrape_until_killed)
+
+    t0 = time.time()
+    result = sched.submit(_cfg(timeout=0.2), "stuck").result(timeout=5)
+
+    assert result == ([], "hard-timeout")
+    assert time.time() - t0 < 1.0
+    assert len(pool.killed) == 1
+    assert sched.stats["timed_out"] == 1
+
+
+def test_deadline_starts_after_checkout(monkeypatch):
+    # Launching Chrome takes longer than the per-channel timeout; the scrape itself is quick.
+    pool = FakePool(checkout_seconds=0.4)
+    sched = _scheduler(pool, monkeypatch, lambda driver, cfg, login: (["https://discord.gg/x"], "found"))
+
+    result = sched.submit(_cfg(timeout=0.2), "slowstart").result(timeout=5)
+
+    assert result == (["https://discord.gg/x"], "found")
+    assert pool.killed == []
+    assert len(pool.checked_in) == 1
+    assert sched.stats["timed_out"] == 0
+
+
+def test_kill_always_finds_a_published_lease(monkeypatch):
+    pool = FakePool()
+    sched = _scheduler(pool, monkeypatch, _scrape_until_killed)
+
+    futs = [sched.submit(_cfg(timeout=0.05, workers=4), f"c{i}") for i in range(8)]
+    results = [f.result(timeout=10) for f in futs]
+
+    assert all(r == ([], "hard-timeout") for r in results)
+    # Every timed-out scrape had its driver killed: none is left holding one.
+    assert len(pool.killed) == 8
+    assert pool.checked_in == []
+
+
+def test_a_slot_freed_by_the_watchdog_goes_to_the_next_task(monkeypatch):
+    pool = FakePool()
+    calls: list[str] = []
+
+    def scrape(driver, cfg, login):
+        calls.append(login)
+        if login == "stuck":
+            return _scrape_until_killed(driver, cfg, login)
+        return [], "rendered-empty"
+
+    sched = _scheduler(pool, monkeypatch, scrape)
+    stuck = sched.submit(_cfg(timeout=0.2), "stuck")
+    after = sched.submit(_cfg(timeout=0.2), "after")
+
+    assert after.result(timeout=5) == ([], "rendered-empty")
+    assert stuck.result(timeout=5) == ([], "hard-timeout")
+    assert calls == ["stuck", "after"]
+
+
+def _gated_scheduler():
+    """workers=1 scheduler whose first task blocks until the gate opens; records run order."""
+    gate = threading.Event()
+    order: list[str] = []
+
+    def run(task):
+        task.begin(None)
+        if task.login == "blocker":
+            gate.wait(5)
+        order.append(task.login)
+        return task.login
+
+    sched = ScrapeScheduler(run, lambda task: None, tick_seconds=0.02)
+    sched.submit(_cfg(timeout=10), "blocker")
+    time.sleep(0.1)  # the blocker holds the only worker
+    return sched, gate, order
+
+
+def test_foreground_tasks_run_before_queued_background_ones():
+    sched, gate, order = _gated_scheduler()
+    bg = sched.submit(_cfg(timeout=10), "refresh", background=True)
+    fg = sched.submit(_cfg(timeout=10), "wanted")
+    gate.set()
+
+    fg.result(timeout=5)
+    bg.result(timeout=5)
+    assert order == ["blocker", "wanted", "refresh"]
+
+
+def test_promote_moves_a_background_task_ahead_of_other_background_work():
+    sched, gate, order = _gated_scheduler()
+    futs = [sched.submit(_cfg(timeout=10), name, background=True) for name in ("a", "b", "c")]
+
+    assert sched.promote("C")  # case-insensitive, like logins
+    assert not sched.promote("unknown")
+    gate.set()
+
+    for f in futs:
+        f.result(timeout=5)
+    assert order == ["blocker", "c", "a", "b"]
+    assert futs[2].result() == "c"
+
+
+def test_cancel_pending_leaves_running_tasks_alone():
+    sched, gate, order = _gated_scheduler()
+    queued = [sched.submit(_cfg(timeout=10), name, background=bg) for name, bg in (("x", False), ("y", True))]
+
+    assert sched.cancel_pending() == 2
+    gate.set()
+    time.sleep(0.2)
+    assert all(f.cancelled() for f in queued)
+    assert order == ["blocker"]
@@ -0,0 +1,104 @@
+import json
+import time
+
+from community_finder.cache_store import SharedCacheStore
+from community_finder.resp import RespClient
+
+
+def _entry(links, ttl=3600.0, ts=None):
+    return {"ts": time.time() if ts is None else ts, "links": links, "status": "found", "attempts": 1, "ttl": ttl}
+
+
+def _store(server_url, local, retain=0.0):
+    return SharedCacheStore(RespClient(server_url), local, retain_seconds=retain, prefix="t:")
+
+
+def test_put_many_writes_portable_entries_with_ttl(resp_server, local_store_factory):
+    store = _store(resp_server.url, local_store_factory())
+    store.put_many({"alpha": _entry(["https://discord.gg/a"]), "beta": _entry([], ttl=60)})
+
+    assert resp_server.count("SET") == 2
+    value, expires = resp_server.data[b"t:entry:alpha"]
+    shared = json.loads(value)
+    assert shared["links"] == ["https://discord.gg/a"]
+    assert "hits" not in shared and "seen" not in shared
+    assert 3590 < expires - time.time() <= 3600
+    assert store.local.get("alpha", touch=False)["links"] == ["https://discord.gg/a"]
+
+
+def test_fresh_local_entries_never_ask_the_server(resp_server, local_store_factory):
+    store = _store(resp_server.url, local_store_factory())
+    store.put("alpha", _entry(["https://discord.gg/a"]))
+    resp_server.commands.clear()
+
+    assert store.get("alpha")["links"] == ["https://discord.gg/a"]
+    assert store.get_many(["alpha"]).keys() == {"alpha"}
+    assert resp_server.commands == []
+
+
+def test_get_many_reads_other_hosts_entries_in_one_mget(resp_server, local_store_factory):
+    writer = _store(resp_server.url, local_store_factory("writer"))
+    writer.put_many({f"user{i}": _entry([f"https://discord.gg/{i}"]) for i in range(50)})
+
+    reader = _store(resp_server.url, local_store_factory("reader"))
+    resp_server.commands.clear()
+    got = reader.get_many([f"user{i}" for i in range(60)])
+
+    assert [c[0] for c in resp_server.commands] == ["MGET"]
+    assert len(resp_server.commands[0]) == 61
+    assert set(got) == {f"user{i}" for i in range(50)}
+    assert got["user7"]["links"] == ["https://discord.gg/7"]
+    assert reader.shared_stats["shared_hits"] == 50
+    assert reader.shared_stats["shared_misses"] == 10
+
+    # Copied into the local layer: the next lookup stays on this host.
+    resp_server.commands.clear()
+    assert reader.get("user7")["links"] == ["https://discord.gg/7"]
+    assert resp_server.commands == []
+
+
+def test_older_shared_entry_does_not_replace_a_newer_local_one(resp_server, local_store_factory):
+    now = time.time()
+    other = _store(resp_server.url, local_store_factory("other"))
+    other.put("alpha", _entry(["https://discord.gg/old"], ttl=7200, ts=now - 3000))
+
+    store = _store(resp_server.url, local_store_factory())
+    # Expired locally, but newer than the shared copy.
+    store.local.put("alpha", _entry(["https://discord.gg/new"], ttl=60, ts=now - 120))
+    assert store.get("alpha")["links"] == ["https://discord.gg/new"]
+    assert store.shared_stats["shared_misses"] == 1
+
+
+def test_shared_entries_expire_on_the_server(resp_server, local_store_factory):
+    store = _store(resp_server.url, local_store_factory("writer"))
+    store.put("alpha", _entry(["https://discord.gg/a"], ttl=0.2))
+    assert resp_server.data[b"t:entry:alpha"][1] - time.time() <= 0.2
+
+    time.sleep(0.3)
+    reader = _store(resp_server.url, local_store_factory("reader"))
+    assert reader.get("alpha") is None
+
+    # Already past its expiry (plus retention): not written at all.
+    resp_server.commands.clear()
+    store.put("beta", _entry(["https://discord.gg/b"], ttl=10, ts=time.time() - 60))
+    assert resp_server.count("SET") == 0
+
+
+def test_unreachable_server_falls_back_to_the_local_store(local_store_factory):
+    store = _store("redis://127.0.0.1:1/0", local_store_factory())
+    store.put("alpha", _entry(["https://discord.gg/a"]))
+
+    assert store.get("alpha")["links"] == ["https://discord.gg/a"]
+    assert store.get("missing") is None
+    assert store.shared_stats["shared_errors"] == 1  # then backs off for RETRY_SECONDS
+
+
+def test_counters_are_added_on_the_server_at_flush(resp_server, local_store_factory):
+    a = _store(resp_server.url, local_store_factory("a"))
+    b = _store(resp_server.url, local_store_factory("b"))
+    a.add_counters(hits=3, misses=1)
+    b.add_counters(hits=2)
+    a.flush()
+    b.flush()
+
+    assert a.fleet_counters() == {"hits": 5, "misses": 1, "purged": 0, "evicted": 0}
@@ -0,0 +1,81 @@
+import gzip
+import json
+import time
+
+import pytest
+
+from community_finder.snapshot import SnapshotError, export_snapshot, import_snapshots, read_snapshot
+
+
+def _entry(ts, links=("https://discord.gg/x",)):
+    return {"ts": ts, "links": list(links), "status": "found", "attempts": 1, "ttl": 3600.0}
+
+
+class CountingStore:
+    """Wraps a store and counts get()/get_many() calls."""
+
+    def __init__(self, inner) -> None:
+        self.inner = inner
+        self.gets = 0
+        self.get_manys = 0
+
+    def get(self, key, touch=True):
+        self.gets += 1
+        return self.inner.get(key, touch)
+
+    def get_many(self, keys, touch=True):
+        self.get_manys += 1
+        return self.inner.get_many(keys, touch)
+
+    def __getattr__(self, name):
+        return getattr(self.inner, name)
+
+
+def test_round_trip_keeps_the_newest_entry(tmp_path, local_store_factory):
+    now = time.time()
+    src = local_store_factory("src")
+    src.put_many({f"user{i}": _entry(now - i) for i in range(1200)})
+    path = str(tmp_path / "snap.jsonl.gz")
+    assert export_snapshot(src, path) == 1200
+
+    dst = CountingStore(local_store_factory("dst"))
+    dst.put("user3", _entry(now + 10, links=()))  # newer here than in the snapshot
+    st = import_snapshots(dst, [path])
+
+    assert st == {"read": 1200, "imported": 1199, "skipped": 1}
+    assert dst.get("user3", touch=False)["links"] == []
+    assert dst.get("user4", touch=False)["links"] == ["https://discord.gg/x"]
+    # One batched lookup per _IMPORT_BATCH records, no per-record get().
+    assert (dst.gets, dst.get_manys) == (2, 3)
+
+
+def test_truncated_snapshot_raises_snapshot_error(tmp_path, local_store_factory):
+    src = local_store_factory("src")
+    src.put_many({f"user{i}": _entry(time.time(), links=[f"https://discord.gg/{i}" * 5]) for i in range(2000)})
+    path = tmp_path / "snap.jsonl.gz"
+    export_snapshot(src, str(path))
+    data = path.read_bytes()
+    path.write_bytes(data[: len(data) // 2])
+
+    with pytest.raises(SnapshotError):
+        list(read_snapshot(str(path)))
+    with pytest.raises(SnapshotError):
+        import_snapshots(local_store_factory("dst"), [str(path)])
+
+
+def test_records_that_are_not_objects_are_skipped(tmp_path):
+    path = tmp_path / "snap.jsonl.gz"
+    with gzip.open(path, "wb") as gz:
+        gz.write(json.dumps({"format": "community-finder-discord-cache", "version": 1}).encode() + b"\n")
+        gz.write(b"[1, 2]\n\"text\"\nnot json\n")
+        gz.write(json.dumps({"login": "Alpha", "entry": _entry(1.0)}).encode() + b"\n")
+
+    assert [login for login, _ in read_snapshot(str(path))] == ["alpha"]
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / "other.gz"
+    with gzip.open(path, "wb") as gz:
+        gz.write(b'{"format": "something-else"}\n')
+    with pytest.raises(SnapshotError):
+        list(read_snapshot(str(path)))
@@ -0,0 +1,29 @@
+import asyncio
+
+from community_finder import twitch_aio
+from community_finder.twitch_aio import StreamsPaginator
+
+
+def test_read_ahead_stays_within_prefetch(monkeypatch):
+    fetched = []
+
+    async def fake_pages(token, url, params):
+        for n in range(10):
+            fetched.append(n)
+            yield {"data": [{"n": n}]}
+
+    monkeypatch.setattr(twitch_aio, "iter_pages", fake_pages)
+
+    async def run():
+        pager = StreamsPaginator("token", "1", "", first=1, prefetch=2)
+        seen = []
+        async with pager:
+            async for page in pager.pages():
+                await asyncio.sleep(0.01)  # let the producer run ahead as far as it may
+                # The page in hand plus at most `prefetch` beyond it.
+                assert len(fetched) - len(seen) <= 1 + 2
+                assert pager.in_flight() <= 2
+                seen.append(page["data"][0]["n"])
+        return seen
+
+    assert asyncio.run(run()) == list(range(10))
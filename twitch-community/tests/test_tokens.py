@@ -0,0 +1,153 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+import requests
+
+from community_finder import helix, tokens
+
+CLIENT_ID = "test-client"
+
+
+class FakeHelix:
+    def __init__(self, validate=None) -> None:
+        self.validate = validate or (lambda token: {"client_id": CLIENT_ID, "expires_in": 3600})
+        self.validations = 0
+
+    def validate_token(self, token):
+        self.validations += 1
+        return self.validate(token)
+
+
+class CountingManager(tokens.TokenManager):
+    def __init__(self, path) -> None:
+        super().__init__(str(path))
+        self.renewals = 0
+
+    def _renew(self, current):
+        self.renewals += 1
+        return {"access_token": f"fresh-{self.renewals}", "expires_in": 3600}
+
+
+@pytest.fixture
+def fake_helix(monkeypatch):
+    monkeypatch.setattr(tokens, "load_settings", lambda: {"TWITCH_CLIENT_ID": CLIENT_ID})
+    fake = FakeHelix()
+    monkeypatch.setattr(tokens, "get_helix_client", lambda: fake)
+    return fake
+
+
+def _stored(path, **fields):
+    data = {"access_token": "stored", "client_id": CLIENT_ID, **fields}
+    path.write_text(json.dumps(data))
+
+
+def test_token_manager_is_abstract(tmp_path):
+    with pytest.raises(TypeError):
+        tokens.TokenManager(str(tmp_path / "t.json"))
+
+
+def test_recently_validated_token_is_reused_without_requests(tmp_path, fake_helix):
+    _stored(tmp_path / "t.json", expires_at=time.time() + 3600, validated_at=time.time())
+    mgr = CountingManager(tmp_path / "t.json")
+
+    assert mgr.access_token() == "stored"
+    assert mgr.cached() == "stored"
+    assert (fake_helix.validations, mgr.renewals) == (0, 0)
+
+
+def test_validate_outage_keeps_the_stored_token(tmp_path, fake_helix):
+    def down(token):
+        raise requests.ConnectionError("no route to host")
+
+    fake_helix.validate = down
+    _stored(tmp_path / "t.json", expires_at=time.time() + 3600, validated_at=time.time() - 7200)
+    mgr = CountingManager(tmp_path / "t.json")
+
+    assert mgr.access_token() == "stored"
+    assert mgr.access_token() == "stored"
+    # One attempt, then it waits TOKEN_VALIDATE_RETRY_SECONDS before asking again.
+    assert (fake_helix.validations, mgr.renewals) == (1, 0)
+
+
+def test_near_expiry_renews_once_for_concurrent_callers(tmp_path, fake_helix):
+    _stored(tmp_path / "t.json", expires_at=time.time() + 10, validated_at=time.time())
+    mgr = CountingManager(tmp_path / "t.json")
+
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(mgr.access_token())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert got == ["fresh-1"] * 8
+    assert mgr.renewals == 1
+    assert json.loads((tmp_path / "t.json").read_text())["access_token"] == "fresh-1"
+
+
+def test_unauthorized_renews_on_next_use(tmp_path, fake_helix):
+    _stored(tmp_path / "t.json", expires_at=time.time() + 3600, validated_at=time.time())
+    mgr = CountingManager(tmp_path / "t.json")
+    mgr.access_token()
+
+    mgr.on_unauthorized("stored")
+    mgr.on_unauthorized("stored")
+    assert mgr.access_token() == "fresh-1"
+    assert mgr.renewals == 1
+
+
+def test_async_401_does_not_block_the_event_loop_during_renewal(tmp_path, fake_helix):
+    _stored(tmp_path / "t.json", expires_at=time.time() + 3600, validated_at=time.time())
+    mgr = CountingManager(tmp_path / "t.json")
+    mgr.access_token()
+
+    class Resp:
+        def __init__(self, status):
+            self.status_code = status
+            self.headers = {}
+            self.reason = ""
+            self.url = "x"
+
+        def json(self):
+            return {"data": []}
+
+    class Session:
+        def get(self, url, headers=None, params=None, timeout=None):
+            return Resp(401 if headers["Authorization"] == "Bearer stored" else 200)
+
+    sync = helix.HelixClient()
+    sync.settings = lambda: {"TWITCH_CLIENT_ID": CLIENT_ID}
+    sync.session = Session()
+
+    async def main():
+        client = helix.AsyncHelixClient(sync)
+        # Another renewal (e.g. a device-flow prompt) holds the manager's lock for a while.
+        held = threading.Event()
+
+        def hold():
+            with mgr._lock:
+                held.set()
+                time.sleep(0.3)
+
+        threading.Thread(target=hold).start()
+        held.wait()
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        t = asyncio.ensure_future(ticker())
+        result = await client.get(mgr, "users", {})
+        t.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(main())
+    assert result == {"data": []}
+    assert ticks >= 10  # the loop kept running while the lock was held
+    assert mgr.renewals == 1